@@ -8,14 +8,26 @@ Features:
 - Decode the base62 record number embedded in a 15/18-char Salesforce ID.
 - Enumerate IDs from a starting integer value OR from the current ID's value.
 - Output 15-char IDs by default; optional 18-char via Salesforce checksum algorithm.
-- Multithreaded enumeration for speed (default 50 threads). With --threads 1,
-  output order is strictly sequential.
+- Multithreaded enumeration for speed (default 50 threads). With --threads 1
+  or --ordered, output order is strictly sequential.
+- Bulk-decode whole ID dumps (file or stdin) into tab-separated records.
+- Bulk-repair ID lists: upgrade 15->18, fix bad checksum suffixes, report bad lines.
+- Recover the casing of upper/lowercased IDs (exact for 18-char, candidates for 15-char).
+- Multi-seed enumeration: +/-N around many seeds, merged into disjoint intervals.
+- Spiral enumeration: nearest neighbours of a seed first, in both directions.
+- Keyed pseudo-random visiting order (--order random) without storing the range.
+- Mask/wildcard generation over any positions (001Vc00000PH???, a0?...).
 
 Output rules:
 - decode mode: prints ONLY the decoded integer.
 - enum modes:
     - when --displayonly: print ONLY Salesforce IDs (15 or 18 chars), one per line.
     - otherwise: write ONLY Salesforce IDs to the file (one per line), NO console output.
+- bulk-repair: one 18-char ID per input line; bad lines and a summary go to stderr.
+- case-recover: restored IDs (or 15-char candidates), one per line; bad lines and a summary
+  go to stderr.
+- bulk-decode: one tab-separated record per input line, in input order, to stdout
+  (--displayonly) or the output file.
 
 References:
 - https://codebycody.com/salesforce-ids-explained/
@@ -25,19 +37,57 @@ References:
 """
 
 import argparse
+import array
+import base64
+import bisect
+import collections
 import concurrent.futures
 import datetime
+import functools
+import gzip
+import hashlib
+import heapq
+import itertools
+import json
+import mmap
 import os
+import re
+import signal
+import struct
 import sys
 from textwrap import dedent
-from typing import Iterable, List, Tuple
+from typing import Callable, Iterable, Iterator, Tuple, TypeVar
 import threading
-import queue
+import time
+import zlib
+
+try:  # optional: enables the vectorized --numpy encoder
+    import numpy as np
+except ImportError:
+    np = None
+
+try:  # optional stdlib codecs (some Python builds omit them)
+    import bz2
+except ImportError:
+    bz2 = None
+try:
+    import lzma
+except ImportError:
+    lzma = None
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 # ---- Base62 using Salesforce alphabet (0-9, A-Z, a-z) ----
 ALPHABET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
 BASE = len(ALPHABET)  # 62
 MAX_BASE62_8 = BASE ** 8 - 1  # maximum value representable by 8 base62 chars
+DEFAULT_CHUNK_SIZE = 10000  # counters encoded per worker task
+DEFAULT_THREADS = 50
+DEFAULT_IO_BUFFER = 1 << 20  # bytes coalesced into one write() by the writer
+DEFAULT_QUEUE_BYTES = 64 << 20  # encoded bytes allowed to wait for the writer
+COMPRESS_BLOCK = 4 << 20  # uncompressed bytes per independently compressed member
+BACKENDS = ("thread", "process", "sequential")
 
 
 def int_to_base62(n: int, min_len: int = 1) -> str:
@@ -57,6 +107,12 @@ def int_to_base62(n: int, min_len: int = 1) -> str:
     return s
 
 
+_ALPHABET_BYTES = ALPHABET.encode("ascii")
+# Every 2-char base62 string -> its value, so an 8-char counter decodes in 4 lookups
+_B62_PAIRS = {(a + b).encode("ascii"): i * BASE + j
+              for i, a in enumerate(ALPHABET) for j, b in enumerate(ALPHABET)}
+
+
 def base62_to_int(s: str) -> int:
     """Convert Base62 string (Salesforce alphabet) to int."""
     n = 0
@@ -70,6 +126,38 @@ def base62_to_int(s: str) -> int:
 
 # ---- Salesforce 15->18 checksum algorithm (Python port of provided JS) ----
 _MAPPING = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ012345")
+_MAPPING_BYTES = "".join(_MAPPING).encode("ascii")
+
+# Reversing a segment and reading it as binary means segment char j carries
+# weight 1 << j. _UPPER_WEIGHT[j][byte] is that weight for uppercase bytes, else 0.
+_UPPER_WEIGHT = tuple(
+    bytes((1 << j) if 0x41 <= b <= 0x5A else 0 for b in range(256)) for j in range(5)
+)
+
+
+def checksum_segment(seg: bytes) -> int:
+    """5-bit uppercase bitmap (0..31) of one 5-char segment, via lookup tables."""
+    w0, w1, w2, w3, w4 = _UPPER_WEIGHT
+    return w0[seg[0]] | w1[seg[1]] | w2[seg[2]] | w3[seg[3]] | w4[seg[4]]
+
+
+@functools.lru_cache(maxsize=256)
+def prefix_checksum(prefix7: str) -> Tuple[int, int]:
+    """
+    Checksum contribution of a 7-char prefix: the complete first segment
+    (chars 0-4) and the low two bits of the second segment (chars 5-6).
+    Computed once per prefix and reused for every ID sharing it.
+    """
+    p = prefix7.encode("ascii", "replace")
+    w0, w1 = _UPPER_WEIGHT[0], _UPPER_WEIGHT[1]
+    return checksum_segment(p[0:5]), w0[p[5]] | w1[p[6]]
+
+
+def checksum_suffix(id15: bytes) -> bytes:
+    """3-char checksum suffix of a 15-byte ASCII ID (bytes in, bytes out)."""
+    m = _MAPPING_BYTES
+    return bytes((m[checksum_segment(id15[0:5])], m[checksum_segment(id15[5:10])],
+                  m[checksum_segment(id15[10:15])]))
 
 
 def id15_to_18(id15: str) -> str:
@@ -80,14 +168,7 @@ def id15_to_18(id15: str) -> str:
     """
     if len(id15) != 15:
         raise ValueError("15->18 conversion requires exactly 15 characters")
-    segments = [id15[i:i + 5] for i in range(0, 15, 5)]
-    reversed_segments = [seg[::-1] for seg in segments]
-    suffix_chars = []
-    for seg in reversed_segments:
-        bits = ''.join('1' if c.isupper() else '0' for c in seg)
-        idx = int(bits, 2)
-        suffix_chars.append(_MAPPING[idx])
-    return id15 + ''.join(suffix_chars)
+    return id15 + checksum_suffix(id15.encode("ascii", "replace")).decode("ascii")
 
 
 def normalize_to_15(sfid: str) -> str:
@@ -104,7 +185,7 @@ def normalize_to_15(sfid: str) -> str:
         core = sfid
     else:
         raise ValueError("Salesforce ID must be 15 or 18 characters long")
-    if not core.isalnum():
+    if not core.isalnum() or any(ch not in ALPHABET for ch in core):
         raise ValueError("Salesforce ID must be alphanumeric")
     return core
 
@@ -126,6 +207,36 @@ def clamp_record_value(v: int) -> int:
     return max(0, min(MAX_BASE62_8, v))
 
 
+# ---- Incremental base62 odometer (sequential enumeration) ----
+# Successor/predecessor byte tables over ALPHABET; 'z' wraps to '0' (and back),
+# which is exactly the carry/borrow case of the odometer.
+_SUCC = bytes.maketrans(ALPHABET.encode("ascii"), (ALPHABET[1:] + ALPHABET[0]).encode("ascii"))
+_PRED = bytes.maketrans(ALPHABET.encode("ascii"), (ALPHABET[-1] + ALPHABET[:-1]).encode("ascii"))
+_FIRST_DIGIT = ord(ALPHABET[0])
+_LAST_DIGIT = ord(ALPHABET[-1])
+COUNTER_POS = 7  # the 8-char counter occupies id15[7:15]
+
+
+def odometer_step(buf: bytearray, step: int, lo: int = COUNTER_POS, hi: int = 15) -> int:
+    """
+    Add step (+1 or -1) to the base62 digits buf[lo:hi] in place, propagating the
+    carry/borrow leftwards. Only the changed trailing characters are rewritten.
+    Returns the index of the leftmost character that changed.
+    """
+    if step > 0:
+        table, wrap = _SUCC, _LAST_DIGIT
+    else:
+        table, wrap = _PRED, _FIRST_DIGIT
+    pos = hi - 1
+    while pos >= lo:
+        c = buf[pos]
+        buf[pos] = table[c]
+        if c != wrap:
+            return pos
+        pos -= 1
+    raise OverflowError("base62 counter out of range")
+
+
 def make_id(prefix7: str, value: int, to18: bool) -> Tuple[str, str, int]:
     """
     Compose a Salesforce ID from prefix7 and base62 value.
@@ -147,7 +258,7 @@ def gen_value_sequence(start_value: int, seq: int) -> Iterable[int]:
     based on the sign of seq. |seq| is the count of IDs to produce.
     """
     if seq == 0:
-        return []
+        return
     count = abs(seq)
     step = 1 if seq > 0 else -1
     current = start_value
@@ -161,226 +272,2759 @@ def gen_value_sequence(start_value: int, seq: int) -> Iterable[int]:
         produced += 1
 
 
-def default_output_filename(script_name: str) -> str:
-    stem = os.path.splitext(os.path.basename(script_name))[0] or "sfid-tool"
-    ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-    return f"{stem}-{ts}.txt"
+def sequence_length(start_value: int, seq: int) -> int:
+    """Number of values gen_value_sequence(start_value, seq) yields (bounds-aware)."""
+    if seq == 0 or not 0 <= start_value <= MAX_BASE62_8:
+        return 0
+    if seq > 0:
+        return min(seq, MAX_BASE62_8 - start_value + 1)
+    return min(-seq, start_value + 1)
 
 
-def write_results_ids(path: str, ids_only: List[str]) -> None:
-    """Write only the Salesforce IDs, one per line (no header, no extras)."""
-    with open(path, "w", encoding="utf-8") as f:
-        for sfid_out in ids_only:
-            f.write(f"{sfid_out}\n")
+def gen_chunk_ranges(start_value: int, seq: int,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple[int, int, int]]:
+    """
+    Split the sequence described by (start_value, seq) into contiguous sub-ranges.
+    Yields (chunk_index, first_value, count); values move in the direction of seq.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be positive")
+    total = sequence_length(start_value, seq)
+    step = 1 if seq > 0 else -1
+    for index, offset in enumerate(range(0, total, chunk_size)):
+        yield index, start_value + offset * step, min(chunk_size, total - offset)
 
 
-def normalize_mode(s: str) -> str:
-    """Normalize mode value and support aliases d/efv/efc (case-insensitive)."""
-    if not s:
-        raise argparse.ArgumentTypeError("Mode is required.")
-    m = s.strip().lower()
-    aliases = {
-        "decode": "decode",
-        "d": "decode",
-        "enum-from-value": "enum-from-value",
-        "efv": "enum-from-value",
-        "enum-from-current": "enum-from-current",
-        "efc": "enum-from-current",
-    }
-    if m not in aliases:
-        raise argparse.ArgumentTypeError(
-            "Invalid --mode. Use one of: decode|d, enum-from-value|efv, enum-from-current|efc"
-        )
-    return aliases[m]
+def parse_shard(s: str) -> Tuple[int, int]:
+    """Parse --shard K/N (1 <= K <= N) into a 0-based (k, n) pair."""
+    try:
+        k, n = (int(x) for x in s.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid shard {s!r}; expected K/N, e.g. 2/8")
+    if not 1 <= k <= n:
+        raise argparse.ArgumentTypeError(f"Invalid shard {s!r}; K must be between 1 and N")
+    return k - 1, n
 
 
-def main(argv=None) -> int:
-    epilog = dedent("""
-    EXAMPLES
-      Decode the record counter (prints integer):
-        sfid_tool.py -i 001Vc00000PHoN1IAL -m d
+def partition_range(total: int, k: int, n: int) -> Tuple[int, int]:
+    """
+    Contiguous slice k (0-based) of n balanced, non-overlapping slices of
+    [0, total): returns (offset, count). Slice sizes differ by at most one and
+    consecutive slices abut, so together they cover [0, total) exactly once.
+    """
+    base, extra = divmod(total, n)
+    return k * base + min(k, extra), base + (1 if k < extra else 0)
 
-      Enumerate from an integer value upward (IDs saved to default file, no console output):
-        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 366897425 --seq 10
 
-      Enumerate downward 5 from the current ID value (print only, 18-char IDs):
-        sfid_tool.py -i 001Vc00000PHoN1 -m efc --seq -5 --displayonly --to18
+def interleaved_length(total: int, chunk_size: int, k: int, n: int) -> int:
+    """Number of values slice k owns when chunks are dealt round-robin to n slices."""
+    chunks = -(-total // chunk_size)
+    owned = max(0, -(-(chunks - k) // n))
+    if owned and (chunks - 1) % n == k:
+        return (owned - 1) * chunk_size + total - (chunks - 1) * chunk_size
+    return owned * chunk_size
 
-      Fixing the 3 last characters to make a valid 18-char ID:
-        sfid_tool.py -i 001Vc00000PHoN1 -m efc --seq 1 --displayonly --to18
 
-      Force sequential order (threads=1) and write to custom file:
-        sfid_tool.py -i 001Vc00000PHoN1IAL -m efc --seq 100 --threads 1 --outfile out.txt
+def gen_interleaved_chunks(start_value: int, seq: int, chunk_size: int,
+                           k: int, n: int) -> Iterator[Tuple[int, int, int]]:
+    """
+    Chunks of gen_chunk_ranges(start_value, seq, chunk_size) whose index is
+    congruent to k modulo n, re-indexed 0, 1, 2... within the slice. Every chunk
+    index has exactly one residue, so the n slices partition the sequence.
+    """
+    total = sequence_length(start_value, seq)
+    step = 1 if seq > 0 else -1
+    for local, index in enumerate(range(k, -(-total // chunk_size), n)):
+        offset = index * chunk_size
+        yield local, start_value + offset * step, min(chunk_size, total - offset)
 
-      Large parallel enumeration (order not guaranteed; file is written safely):
-        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 500000 --threads 100
 
-    NOTES
-      - In enum modes, nothing is printed unless --displayonly is used.
-      - decode mode prints ONLY the decoded integer.
-      - When not using --displayonly, results are written to a text file (IDs only, one per line).
-      - Valid base62 integer bounds for the 8-char counter: 0 .. 62^8 - 1.
-    """).strip("\n")
+class IdRange:
+    """
+    A normalized set of record counters: sorted, disjoint, non-adjacent
+    inclusive intervals clamped to 0..MAX_BASE62_8, stored as two parallel
+    array('Q') columns (16 bytes per interval). Supports union (|),
+    intersection (&) and difference (-) as linear merges of the interval
+    lists, and split() into chunk-sized sub-ranges for the workers.
+    len() is the number of counters, iteration yields (lo, hi) intervals.
+    """
 
-    parser = argparse.ArgumentParser(
-        description="Salesforce ID decode/enumeration tool (base62 record number)",
-        formatter_class=argparse.RawTextHelpFormatter,
-        epilog=epilog,
-    )
-    # --id with -i short
-    parser.add_argument(
-        "-i", "--id",
-        required=True,
-        help="Salesforce ID (15 or 18 chars)",
-    )
+    __slots__ = ("starts", "ends", "_count")
 
-    # --mode with aliases
-    parser.add_argument(
-        "-m", "--mode",
-        required=True,
-        type=normalize_mode,
-        help="Operation mode: decode|d, enum-from-value|efv, enum-from-current|efc",
-    )
+    def __init__(self, intervals: Iterable[Tuple[int, int]] = ()):
+        self.starts = array.array("Q")
+        self.ends = array.array("Q")
+        self._count = 0
+        for lo, hi in sorted((max(0, lo), min(MAX_BASE62_8, hi)) for lo, hi in intervals):
+            if lo <= hi:
+                self._append(lo, hi)
 
-    # Enum parameters
-    parser.add_argument(
-        "--start",
-        type=int,
-        help="(optional) (enum-from-value) Starting integer value for 8-char base62 (0..62^8-1)",
-    )
-    parser.add_argument(
-        "--seq",
-        type=int,
-        help="Number of IDs to generate. Positive=upward, Negative=downward (required for enum modes)",
-    )
-    parser.add_argument(
-        "--threads",
-        type=int,
-        default=50,
-        help="(optional) Worker threads for enum modes (default 50). Use 1 for strict sequential output.",
-    )
-    parser.add_argument(
-        "--displayonly",
-        action="store_true",
-        help="(optional) Do not write to file; only print results to stdout",
-    )
-    parser.add_argument(
-        "--outfile",
-        help="(optional) Output filename (for enum modes). Default is <scriptname>-<timestamp>.txt",
-    )
-    parser.add_argument(
-        "--to18",
-        action="store_true",
-        help="(optional) Output 18-char IDs (default outputs 15-char)",
-    )
+    @classmethod
+    def _from_sorted(cls, intervals: Iterable[Tuple[int, int]]) -> "IdRange":
+        """Build from intervals already sorted by lo (coalescing only, no sort)."""
+        rng = cls()
+        starts, ends, count = rng.starts, rng.ends, 0
+        cur_lo = cur_hi = None
+        for lo, hi in intervals:
+            if cur_hi is not None and lo <= cur_hi + 1:
+                if hi > cur_hi:
+                    cur_hi = hi
+                continue
+            if cur_hi is not None:
+                starts.append(cur_lo)
+                ends.append(cur_hi)
+                count += cur_hi - cur_lo + 1
+            cur_lo, cur_hi = lo, hi
+        if cur_hi is not None:
+            starts.append(cur_lo)
+            ends.append(cur_hi)
+            count += cur_hi - cur_lo + 1
+        rng._count = count
+        return rng
 
-    args = parser.parse_args(argv)
+    @classmethod
+    def _from_counters(cls, values: Iterable[int]) -> "IdRange":
+        """Build from single counters in ascending order (duplicates allowed)."""
+        rng = cls()
+        starts, ends, count = rng.starts, rng.ends, 0
+        values = iter(values)
+        lo = hi = next(values, None)
+        if lo is None:
+            return rng
+        for v in values:
+            if v > hi + 1:
+                starts.append(lo)
+                ends.append(hi)
+                count += hi - lo + 1
+                lo = v
+            hi = max(hi, v)
+        starts.append(lo)
+        ends.append(hi)
+        rng._count = count + hi - lo + 1
+        return rng
 
-    # Normalize ID to 15 chars & split components
-    try:
-        id15 = normalize_to_15(args.id)
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        return 2
+    def _append(self, lo: int, hi: int) -> None:
+        ends = self.ends
+        if ends and lo <= ends[-1] + 1:
+            if hi > ends[-1]:
+                self._count += hi - ends[-1]
+                ends[-1] = hi
+        else:
+            self.starts.append(lo)
+            ends.append(hi)
+            self._count += hi - lo + 1
 
-    try:
-        prefix7, counter8 = split_id_components(id15)
-        current_value = base62_to_int(counter8)
-    except Exception as e:
-        print(f"Error: {e}", file=sys.stderr)
-        return 2
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return zip(self.starts, self.ends)
 
-    # Mode: decode -> print integer only and exit
-    if args.mode == "decode":
-        print(current_value)
-        return 0
+    def __len__(self) -> int:
+        return self._count
 
-    # Enum modes require --seq (non-zero)
-    if args.seq is None or args.seq == 0:
-        print("Error: --seq must be provided and non-zero for enumeration modes.", file=sys.stderr)
-        return 2
+    def __bool__(self) -> bool:
+        return bool(self.starts)
 
-    if args.mode == "enum-from-value":
-        if args.start is None:
-            print("Error: --start must be provided for --mode enum-from-value.", file=sys.stderr)
-            return 2
-        if args.start < 0 or args.start > MAX_BASE62_8:
-            print(f"Error: --start must be between 0 and {MAX_BASE62_8}.", file=sys.stderr)
-            return 2
-        start_value = args.start
-    else:
-        # enum-from-current
-        start_value = current_value
+    def __contains__(self, value: int) -> bool:
+        i = bisect.bisect_right(self.starts, value) - 1
+        return i >= 0 and value <= self.ends[i]
 
-    # Build sequence of values
-    values = list(gen_value_sequence(start_value, args.seq))
-    if not values:
-        # No stdout output since you want only IDs there; error goes to stderr
-        print("No values generated (sequence may have exceeded bounds).", file=sys.stderr)
-        return 3
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IdRange):
+            return NotImplemented
+        return self.starts == other.starts and self.ends == other.ends
 
-    # ENUMERATION OUTPUT BEHAVIOR:
-    # - displayonly: print IDs to stdout (only).
-    # - else: write IDs to file (only), with thread-safe writer.
-    if args.displayonly:
-        # PRINT ONLY
-        if args.threads <= 1:
-            # Strict sequential
-            for v in values:
-                sfid_out, _, _ = make_id(prefix7, v, to18=args.to18)
-                print(sfid_out)
+    def __repr__(self) -> str:
+        return f"IdRange({list(self)!r})"
+
+    @property
+    def runs(self) -> int:
+        """Number of disjoint intervals."""
+        return len(self.starts)
+
+    def union(self, other: "IdRange") -> "IdRange":
+        return IdRange._from_sorted(heapq.merge(self, other))
+
+    def intersection(self, other: "IdRange") -> "IdRange":
+        out = IdRange()
+        a_lo, a_hi, b_lo, b_hi = self.starts, self.ends, other.starts, other.ends
+        i = j = 0
+        while i < len(a_lo) and j < len(b_lo):
+            lo, hi = max(a_lo[i], b_lo[j]), min(a_hi[i], b_hi[j])
+            if lo <= hi:
+                out._append(lo, hi)
+            if a_hi[i] < b_hi[j]:
+                i += 1
+            else:
+                j += 1
+        return out
+
+    def difference(self, other: "IdRange") -> "IdRange":
+        return IdRange._from_sorted(self.iter_difference(other))
+
+    def iter_difference(self, other: "IdRange") -> Iterator[Tuple[int, int]]:
+        """Lazily yield the intervals of self - other, without building the result."""
+        b_lo, b_hi = other.starts, other.ends
+        nb, j = len(b_lo), 0
+        for lo, hi in self:
+            while j < nb and b_hi[j] < lo:
+                j += 1
+            cur, k = lo, j
+            while k < nb and b_lo[k] <= hi:
+                if b_lo[k] > cur:
+                    yield cur, b_lo[k] - 1
+                cur = max(cur, b_hi[k] + 1)
+                k += 1
+            if cur <= hi:
+                yield cur, hi
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def split(self, chunk_size: int) -> Iterator[Tuple[int, int]]:
+        """Ascending (first, count) sub-ranges of at most chunk_size counters."""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be positive")
+        for lo, hi in self:
+            for first in range(lo, hi + 1, chunk_size):
+                yield first, min(chunk_size, hi + 1 - first)
+
+
+_RANGE_TERM = re.compile(r"(?:(?P<rel>[+~-])(?P<n>\d+)|(?P<a>\d+)(?:-(?P<b>\d+))?)(?:@(?P<id>\w+))?")
+
+
+def parse_range_expr(expr: str, default_id: str = None) -> dict:
+    """
+    Parse a comma-separated range expression into {prefix7: IdRange}:
+      A-B      record numbers A..B (inclusive)     V      the single record V
+      +N       N IDs upward from the anchor         -N     N IDs downward from the anchor
+      ~N       N IDs below and above the anchor
+    Any term may end in @ID, which sets its prefix7 (and anchor); otherwise
+    default_id (-i) is used. Overlapping terms are merged. Raises ValueError.
+    """
+    groups = {}
+    for term in (t.strip() for t in expr.split(",")):
+        m = _RANGE_TERM.fullmatch(term)
+        if not m:
+            raise ValueError(f"invalid range term {term!r}")
+        sfid = m.group("id") or default_id
+        if sfid is None:
+            raise ValueError(f"range term {term!r} needs -i/--id or an @ID anchor")
+        prefix7, counter8 = split_id_components(normalize_to_15(sfid))
+        if m.group("rel"):
+            anchor, n = base62_to_int(counter8), int(m.group("n"))
+            lo, hi = {"+": (anchor, anchor + n - 1),
+                      "-": (anchor - n + 1, anchor),
+                      "~": (anchor - n, anchor + n)}[m.group("rel")]
         else:
-            # Parallel; order not guaranteed
-            with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as exe:
-                futs = [exe.submit(make_id, prefix7, v, args.to18) for v in values]
-                for fut in concurrent.futures.as_completed(futs):
-                    sfid_out, _, _ = fut.result()
-                    print(sfid_out)
-    else:
-        # FILE ONLY
-        outfile = args.outfile or default_output_filename(sys.argv[0] if sys.argv else "sfid-tool.py")
+            lo = int(m.group("a"))
+            hi = int(m.group("b")) if m.group("b") is not None else lo
+            if lo > hi or hi > MAX_BASE62_8:
+                raise ValueError(f"invalid range term {term!r}; need A <= B <= {MAX_BASE62_8}")
+        groups.setdefault(prefix7, []).append((lo, hi))
+    return {p: IdRange(ivs) for p, ivs in sorted(groups.items())}
 
-        # Single writer thread consuming from a queue to avoid race conditions.
-        q: "queue.Queue[str | None]" = queue.Queue(maxsize=10000)
-        writer_error = {"exc": None}
 
-        def writer():
-            try:
-                with open(outfile, "w", encoding="utf-8") as f:
-                    while True:
-                        line = q.get()
-                        if line is None:
-                            break
-                        f.write(line)
-            except Exception as e:
-                writer_error["exc"] = e
+def parse_window(s: str) -> Tuple[int, int]:
+    """Parse --window N (N per side) or BELOW:ABOVE into a (below, above) pair of counts."""
+    try:
+        sides = [int(x) for x in s.split(":")]
+    except ValueError:
+        sides = []
+    if len(sides) not in (1, 2) or min(sides) < 0:
+        raise argparse.ArgumentTypeError(f"Invalid window {s!r}; expected N or BELOW:ABOVE, e.g. 500 or 100:900")
+    return sides[0], sides[-1]
 
-        t = threading.Thread(target=writer, daemon=True)
-        t.start()
 
+def seed_windows(seeds: Iterable[str], window: Tuple[int, int]) -> Tuple[dict, list]:
+    """
+    Group seed IDs (15 or 18 chars) by prefix7 and merge their
+    [value - below, value + above] windows, clamped to 0..MAX_BASE62_8.
+    Returns ({prefix7: [(lo, hi), ...]}, [rejected seeds]).
+    """
+    below, above = window
+    groups, rejected = {}, []
+    for seed in seeds:
         try:
-            if args.threads <= 1:
-                # Sequential generation, sequential writes
-                for v in values:
-                    sfid_out, _, _ = make_id(prefix7, v, to18=args.to18)
-                    q.put(f"{sfid_out}\n")
-            else:
-                # Parallel generation; the single writer ensures no file races.
-                with concurrent.futures.ThreadPoolExecutor(max_workers=args.threads) as exe:
-                    futs = [exe.submit(make_id, prefix7, v, args.to18) for v in values]
-                    for fut in concurrent.futures.as_completed(futs):
-                        sfid_out, _, _ = fut.result()
-                        q.put(f"{sfid_out}\n")
+            prefix7, counter8 = split_id_components(normalize_to_15(seed))
+        except ValueError:
+            rejected.append(seed)
+            continue
+        value = base62_to_int(counter8)
+        groups.setdefault(prefix7, []).append(
+            (clamp_record_value(value - below), clamp_record_value(value + above)))
+    return {p: IdRange(ivs) for p, ivs in sorted(groups.items())}, rejected
+
+
+def gen_interval_chunks(groups: dict, chunk_size: int,
+                        excluded: dict = None) -> Iterator[Tuple[int, str, list]]:
+    """
+    Pack the IdRange of every prefix (minus excluded[prefix7], subtracted
+    lazily, when given) into ascending tasks of chunk_size counters. Yields
+    (chunk_index, prefix7, [(first_value, count), ...]); a task holds several
+    runs when the intervals are short, so task overhead scales with IDs.
+    """
+    index = 0
+    for prefix7, rng in groups.items():
+        intervals = rng.iter_difference(excluded[prefix7]) if excluded else iter(rng)
+        runs, size = [], 0
+        for lo, hi in intervals:
+            while lo <= hi:
+                take = min(chunk_size - size, hi - lo + 1)
+                runs.append((lo, take))
+                size += take
+                lo += take
+                if size == chunk_size:
+                    yield index, prefix7, runs
+                    index += 1
+                    runs, size = [], 0
+        if runs:
+            yield index, prefix7, runs
+            index += 1
+
+
+def gen_spiral_chunks(seed: int, window: Tuple[int, int],
+                      chunk_size: int) -> Tuple[Tuple[int, int], Iterator[Tuple[int, int, int]]]:
+    """
+    Plan a nearest-first walk around `seed`: the per-side budgets are clamped
+    to the 0 and MAX_BASE62_8 bounds, and distances 0..max(below, above) are
+    split into chunks. Returns ((below, above), chunks of
+    (chunk_index, first_distance, count)).
+    """
+    below = min(window[0], seed)
+    above = min(window[1], MAX_BASE62_8 - seed)
+    total = max(below, above) + 1
+    chunks = ((index, d, min(chunk_size, total - d)) for index, d in enumerate(range(0, total, chunk_size)))
+    return (below, above), chunks
+
+
+class FeistelPermutation:
+    """
+    Keyed pseudo-random permutation of range(size), computed per element in
+    O(1) time and memory: a 4-round balanced Feistel network over the smallest
+    even-width bit domain covering size, with cycle walking (re-encrypting
+    until the result lands below size; fewer than 4 rounds trips on average).
+    The same (size, key) always gives the same order.
+    """
+
+    __slots__ = ("size", "half_bits", "half_mask", "shift", "keys")
+
+    ROUNDS = 4
+    _MULT = 0x9E3779B97F4A7C15
+    _MASK64 = (1 << 64) - 1
+
+    def __init__(self, size: int, key: str = "0"):
+        if size < 1:
+            raise ValueError("permutation size must be positive")
+        self.size = size
+        self.half_bits = max(1, -(-(size - 1).bit_length() // 2))
+        self.half_mask = (1 << self.half_bits) - 1
+        self.shift = 64 - self.half_bits
+        digest = hashlib.sha256(f"sfidenum:{key}:{size}".encode("utf-8")).digest()
+        self.keys = struct.unpack("<4Q", digest)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _encrypt(self, x: int) -> int:
+        bits, mask, shift = self.half_bits, self.half_mask, self.shift
+        mult, m64 = self._MULT, self._MASK64
+        left, right = x >> bits, x & mask
+        for k in self.keys:
+            left, right = right, left ^ (((right ^ k) * mult & m64) >> shift)
+        return (left << bits) | right
+
+    def __call__(self, i: int) -> int:
+        """Position i (0 <= i < size) -> its permuted index."""
+        x = self._encrypt(i)
+        while x >= self.size:
+            x = self._encrypt(x)
+        return x
+
+    def map_array(self, positions):
+        """Vectorized __call__ over a uint64 NumPy array of positions. Requires NumPy."""
+        bits = np.uint64(self.half_bits)
+        mask, shift = np.uint64(self.half_mask), np.uint64(self.shift)
+        mult = np.uint64(self._MULT)
+        keys = [np.uint64(k) for k in self.keys]
+
+        def encrypt(x):
+            left, right = x >> bits, x & mask
+            for k in keys:
+                left, right = right, left ^ (((right ^ k) * mult) >> shift)
+            return (left << bits) | right
+
+        out = encrypt(positions.astype(np.uint64))
+        pending = np.nonzero(out >= self.size)[0]
+        while pending.size:
+            out[pending] = encrypt(out[pending])
+            pending = pending[out[pending] >= self.size]
+        return out
+
+
+def encode_range(prefix7: str, first: int, count: int, step: int, to18: bool) -> bytes:
+    """
+    Encode `count` consecutive counters into one newline-terminated block of IDs.
+    Only the first counter is fully base62-encoded; every following line is
+    produced by stepping an odometer over a reused bytearray line template, and
+    the 18-char suffix is patched from precomputed checksum tables.
+    """
+    if count <= 0:
+        return b""
+    line = bytearray(f"{make_id(prefix7, first, to18)[0]}\n".encode("ascii"))
+    out = bytearray(line)
+    if not to18:
+        for _ in range(count - 1):
+            odometer_step(line, step)
+            out += line
+        return bytes(out)
+
+    # Checksum segments: chars 0-4 (prefix only, fixed), chars 5-9 (2 prefix +
+    # 3 counter chars) and chars 10-14 (counter only). Only the segments whose
+    # characters changed are recomputed after each step.
+    _, seg1_prefix = prefix_checksum(prefix7)
+    w0, w1, w2, w3, w4 = _UPPER_WEIGHT
+    mapping = _MAPPING_BYTES
+    seg2_high = w0[line[10]] | w1[line[11]] | w2[line[12]] | w3[line[13]]
+    for _ in range(count - 1):
+        pos = odometer_step(line, step)
+        if pos <= 13:
+            if pos <= 9:
+                line[16] = mapping[seg1_prefix | w2[line[7]] | w3[line[8]] | w4[line[9]]]
+            seg2_high = w0[line[10]] | w1[line[11]] | w2[line[12]] | w3[line[13]]
+        line[17] = mapping[seg2_high | w4[line[14]]]
+        out += line
+    return bytes(out)
+
+
+# Value 0..3843 -> its 2-char base62 string, so an 8-char counter encodes in 4 lookups
+_B62_PAIR_CHARS = [(a + b).encode("ascii") for a in ALPHABET for b in ALPHABET]
+
+
+def encode_values(prefix7: str, values: Iterable[int], to18: bool) -> bytes:
+    """Encode arbitrary (non-contiguous) counters into one newline-terminated block."""
+    p = _B62_PAIR_CHARS
+    head = prefix7.encode("ascii")
+    out = []
+    for v in values:
+        v = clamp_record_value(v)
+        hi, lo = divmod(v, 14776336)  # 62^4
+        id15 = head + p[hi // 3844] + p[hi % 3844] + p[lo // 3844] + p[lo % 3844]
+        out.append(id15 + checksum_suffix(id15) if to18 else id15)
+    return b"\n".join(out) + b"\n" if out else b""
+
+
+def encode_range_numpy(prefix7: str, first: int, count: int, step: int, to18: bool):
+    """
+    Vectorized encode_range: builds all lines of the block as one fixed-width
+    uint8 matrix (base62 digits by array divmod, checksum by table gathers) and
+    returns its flat buffer, which sinks write without further conversion.
+    Output is byte-identical to encode_range. Requires NumPy.
+    """
+    return encode_values_numpy(prefix7, np.arange(count, dtype=np.int64) * step + first, to18)
+
+
+def encode_values_numpy(prefix7: str, values, to18: bool):
+    """Vectorized encode_values for an int64 array of counters. Requires NumPy."""
+    count = len(values)
+    width = 19 if to18 else 16
+    mat = np.empty((count, width), dtype=np.uint8)
+    mat[:, :7] = np.frombuffer(prefix7.encode("ascii"), dtype=np.uint8)
+    alphabet = np.frombuffer(ALPHABET.encode("ascii"), dtype=np.uint8)
+    for pos in range(14, COUNTER_POS - 1, -1):
+        values, digits = np.divmod(values, BASE)
+        mat[:, pos] = alphabet[digits]
+    if to18:
+        upper = (mat[:, :15] >= 0x41) & (mat[:, :15] <= 0x5A)
+        weights = np.array([1, 2, 4, 8, 16], dtype=np.uint8)
+        segments = (upper.reshape(count, 3, 5) * weights).sum(axis=2)
+        mat[:, 15:18] = np.frombuffer(_MAPPING_BYTES, dtype=np.uint8)[segments]
+    mat[:, -1] = 0x0A  # newline
+    return mat.reshape(-1)
+
+
+def select_encoder(use_numpy: bool) -> Callable[..., bytes]:
+    """Pick the vectorized encoder when requested and NumPy is importable."""
+    if use_numpy and np is not None:
+        return encode_range_numpy
+    return encode_range
+
+
+def encode_chunk(encoder: Callable[..., bytes], prefix7: str, step: int, to18: bool,
+                 chunk: Tuple[int, int, int]) -> bytes:
+    """Worker entry point: encode one (chunk_index, first_value, count) sub-range."""
+    _, first, count = chunk
+    return encoder(prefix7, first, count, step, to18)
+
+
+def encode_permuted_chunk(use_numpy: bool, prefix7: str, base: int, step: int,
+                          perm: FeistelPermutation, to18: bool, chunk: Tuple[int, int, int]) -> bytes:
+    """
+    Worker entry point for --order random. The chunk addresses sequence
+    positions exactly like a sequential chunk (first = base + position * step);
+    each position is mapped through `perm` to the counter actually emitted, so
+    chunking, sharding and checkpoints work unchanged.
+    """
+    _, first, count = chunk
+    pos = (first - base) * step
+    if use_numpy and np is not None:
+        positions = np.arange(pos, pos + count, dtype=np.uint64)
+        values = perm.map_array(positions).astype(np.int64) * step + base
+        return encode_values_numpy(prefix7, values, to18)
+    return encode_values(prefix7, (base + step * perm(p) for p in range(pos, pos + count)), to18)
+
+
+def permuted_counters(base: int, step: int, perm: FeistelPermutation,
+                      chunk: Tuple[int, int, int]) -> array.array:
+    """Worker entry point for --order random --format binary: the chunk's counters as array('Q')."""
+    _, first, count = chunk
+    pos = (first - base) * step
+    return array.array("Q", (base + step * perm(p) for p in range(pos, pos + count)))
+
+
+def encode_spiral_chunk(encoder: Callable[..., bytes], prefix7: str, seed: int,
+                        sides: Tuple[int, int], to18: bool, chunk: Tuple[int, int, int]) -> bytes:
+    """
+    Worker entry point for spiral: IDs at distances [first, first + count) from
+    the seed as seed, seed+1, seed-1, seed+2, seed-2, ... Each side is one
+    odometer run; the two fixed-width blocks are interleaved line by line, and
+    once one side's budget is spent the other continues alone.
+    """
+    _, first, count = chunk
+    below, above = sides
+    width = line_width(to18)
+    d0, d1 = max(first, 1), first + count - 1
+    up = memoryview(encoder(prefix7, seed + d0, max(0, min(d1, above) - d0 + 1), 1, to18))
+    down = memoryview(encoder(prefix7, seed - d0, max(0, min(d1, below) - d0 + 1), -1, to18))
+    parts = [encoder(prefix7, seed, 1, 1, to18)] if first == 0 else []
+    paired = min(len(up), len(down))
+    for i in range(0, paired, width):
+        parts.append(up[i:i + width])
+        parts.append(down[i:i + width])
+    parts.append(up[paired:] if len(up) > paired else down[paired:])
+    return b"".join(parts)
+
+
+def encode_interval_chunk(encoder: Callable[..., bytes], to18: bool,
+                          chunk: Tuple[int, str, list]) -> bytes:
+    """Worker entry point: encode one (chunk_index, prefix7, [(first_value, count), ...]) task."""
+    _, prefix7, runs = chunk
+    if len(runs) == 1:
+        return encoder(prefix7, runs[0][0], runs[0][1], 1, to18)
+    if sum(count for _, count in runs) < 16 * len(runs):
+        # Fragmented (e.g. after --exclude): per-run odometer setup would dominate
+        return encode_values(prefix7, (v for first, count in runs for v in range(first, first + count)), to18)
+    return b"".join(encoder(prefix7, first, count, 1, to18) for first, count in runs)
+
+
+def bounded_map(exe: concurrent.futures.Executor, fn: Callable[..., R],
+                items: Iterable[T], window: int, ordered: bool = False) -> Iterator[R]:
+    """
+    Submit fn(item) for each item while keeping at most `window` futures pending.
+    Results are yielded as they complete (order not guaranteed) unless `ordered`,
+    in which case they are released in submission order from a FIFO reorder
+    buffer. Items are pulled from the iterable only when a slot frees up, so
+    memory stays constant.
+    """
+    if ordered:
+        fifo = collections.deque()
+        try:
+            for item in items:
+                fifo.append(exe.submit(fn, item))
+                if len(fifo) >= window:
+                    yield fifo.popleft().result()
+                # Release finished head results early so the first IDs are not
+                # held back until the window fills
+                while fifo and fifo[0].done():
+                    yield fifo.popleft().result()
+            while fifo:
+                yield fifo.popleft().result()
         finally:
-            # Signal writer to finish and wait for it
-            q.put(None)
-            t.join()
+            # Consumer stopped early (error, Ctrl+C, closed pipe): drop queued work
+            for fut in fifo:
+                fut.cancel()
+        return
+    pending = set()
+    try:
+        for item in items:
+            pending.add(exe.submit(fn, item))
+            if len(pending) >= window:
+                done, pending = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for fut in done:
+                    yield fut.result()
+        for fut in concurrent.futures.as_completed(pending):
+            pending.discard(fut)
+            yield fut.result()
+    finally:
+        for fut in pending:
+            fut.cancel()
 
-        if writer_error["exc"] is not None:
-            print(f"Error writing to file '{outfile}': {writer_error['exc']}", file=sys.stderr)
-            return 4
 
-    return 0
+def default_workers(backend: str) -> int:
+    """Default worker count: 50 threads, one process per core, 1 for sequential."""
+    if backend == "process":
+        return os.cpu_count() or 1
+    if backend == "sequential":
+        return 1
+    return DEFAULT_THREADS
+
+
+def plan_memory(max_memory: int, block_bytes: int, workers: int) -> Tuple[int, int]:
+    """
+    Turn a --max-memory byte budget into (window, queue_bytes): the number of
+    chunks allowed in flight between producers and the writer, and the byte
+    bound of the writer queue. Half of the budget goes to each. An in-flight
+    chunk is counted twice (its result plus the copy made when a worker process
+    hands it back). Without a budget: 4 chunks per worker and a 64 MiB queue.
+    Because a full queue blocks the consumer loop, which in turn stops new
+    submissions, the two bounds together cap memory for the whole pipeline.
+    """
+    default_window = max(1, workers) * 4
+    if not max_memory:
+        return default_window, DEFAULT_QUEUE_BYTES
+    half = max_memory // 2
+    window = max(1, min(default_window, half // (2 * max(1, block_bytes))))
+    return window, max(1, half)
+
+
+def ignore_sigint() -> None:
+    """Process-pool initializer: Ctrl+C is handled by the main process only."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def iter_blocks(fn: Callable[[T], R], chunks: Iterable[T], backend: str,
+                workers: int, window: int, ordered: bool = False) -> Iterator[R]:
+    """
+    Run fn over every chunk on the selected execution backend and stream results
+    back to the (single) caller. "thread" shares the GIL and suits I/O-bound sinks;
+    "process" shards chunks across cores for CPU-bound encoding (fn and its
+    arguments must be picklable); "sequential" (or workers <= 1) runs in order.
+    With `ordered`, parallel results are yielded in chunk order, so the output
+    is byte-identical to a sequential run.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend: {backend!r}")
+    if backend == "sequential" or workers <= 1:
+        for chunk in chunks:
+            yield fn(chunk)
+        return
+    if backend == "process":
+        exe = concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=ignore_sigint)
+    else:
+        exe = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    with exe:
+        yield from bounded_map(exe, fn, chunks, window, ordered)
+
+
+# ---- Masks (wildcard IDs) ----
+class IdMask:
+    """
+    A 15-position ID pattern: a literal base62 char, ? (any of the 62), or a
+    [...] class with ranges and optional ^ negation, e.g. 001Vc00000PH???,
+    a0?Vc00000[0-9A-F]????. Candidates are ranked as a mixed-radix number
+    (leftmost position most significant, each class in alphabet order), so
+    rank order is ascending ID order and any rank maps to its ID in O(15).
+    """
+
+    __slots__ = ("pattern", "classes", "radices", "size", "varying")
+
+    def __init__(self, pattern: str):
+        classes = []
+        i = 0
+        while i < len(pattern):
+            ch = pattern[i]
+            if ch == "?":
+                chars = ALPHABET
+            elif ch == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    raise ValueError(f"unterminated [ in mask {pattern!r}")
+                chars = self._parse_class(pattern[i + 1:end], pattern)
+                i = end
+            elif ch in ALPHABET:
+                chars = ch
+            else:
+                raise ValueError(f"invalid character {ch!r} in mask {pattern!r}")
+            classes.append(chars.encode("ascii"))
+            i += 1
+        if len(classes) != 15:
+            raise ValueError(f"mask {pattern!r} has {len(classes)} positions; expected 15")
+        self.pattern = pattern
+        self.classes = tuple(classes)
+        self.radices = tuple(len(c) for c in classes)
+        self.size = functools.reduce(lambda a, b: a * b, self.radices, 1)
+        # Positions that change, rightmost (fastest) first
+        self.varying = tuple(i for i in range(14, -1, -1) if self.radices[i] > 1)
+
+    @staticmethod
+    def _parse_class(body: str, pattern: str) -> str:
+        negate = body.startswith("^")
+        if negate:
+            body = body[1:]
+        chars = set()
+        i = 0
+        while i < len(body):
+            if i + 2 < len(body) and body[i + 1] == "-":
+                lo, hi = body[i], body[i + 2]
+                if lo not in ALPHABET or hi not in ALPHABET or ALPHABET.index(lo) > ALPHABET.index(hi):
+                    raise ValueError(f"invalid range {body[i:i + 3]!r} in mask {pattern!r}")
+                chars.update(ALPHABET[ALPHABET.index(lo):ALPHABET.index(hi) + 1])
+                i += 3
+            else:
+                if body[i] not in ALPHABET:
+                    raise ValueError(f"invalid character {body[i]!r} in mask {pattern!r}")
+                chars.add(body[i])
+                i += 1
+        if negate:
+            chars = set(ALPHABET) - chars
+        if not chars:
+            raise ValueError(f"empty character class in mask {pattern!r}")
+        return "".join(ch for ch in ALPHABET if ch in chars)
+
+    def _digits(self, rank: int) -> list:
+        digits = [0] * 15
+        for i in self.varying:
+            rank, digits[i] = divmod(rank, self.radices[i])
+        return digits
+
+    def id_at(self, rank: int) -> bytes:
+        """The 15-char ID of rank (0 <= rank < size)."""
+        return bytes(c[d] for c, d in zip(self.classes, self._digits(rank)))
+
+    def encode_range(self, first: int, count: int, to18: bool) -> bytes:
+        """
+        IDs of ranks [first, first + count) as one newline-terminated block.
+        The rightmost varying position sweeps its class over a reused line
+        (only its checksum segment is patched); on a carry, only the changed
+        positions and the checksum segments from the leftmost change onward
+        are rewritten.
+        """
+        classes, radices, varying = self.classes, self.radices, self.varying
+        count = max(0, min(count, self.size - first))
+        if count <= 0:
+            return b""
+        digits = self._digits(first)
+        line = bytearray(c[d] for c, d in zip(classes, digits))
+        if to18:
+            line += checksum_suffix(bytes(line))
+        line += b"\n"
+        if not varying:
+            return bytes(line)
+        out = bytearray()
+        mapping = _MAPPING_BYTES
+        inner = varying[0]
+        cls = classes[inner]
+        seg, bit = inner // 5, 1 << (inner % 5)
+        up = [bit if 0x41 <= c <= 0x5A else 0 for c in cls]
+        remaining = count
+        while True:
+            d = digits[inner]
+            n = min(len(cls) - d, remaining)
+            if to18:
+                base = checksum_segment(line[seg * 5:seg * 5 + 5]) & ~bit
+                for j in range(d, d + n):
+                    line[inner] = cls[j]
+                    line[15 + seg] = mapping[base | up[j]]
+                    out += line
+            else:
+                for c in cls[d:d + n]:
+                    line[inner] = c
+                    out += line
+            remaining -= n
+            if not remaining:
+                return bytes(out)
+            # Carry into the next varying positions (odometer over the mask)
+            digits[inner] = 0
+            line[inner] = cls[0]
+            changed = inner
+            for i in varying[1:]:
+                digit = digits[i] + 1
+                if digit < radices[i]:
+                    digits[i] = digit
+                    line[i] = classes[i][digit]
+                    changed = i
+                    break
+                digits[i] = 0
+                line[i] = classes[i][0]
+            if to18:
+                for k in range(changed // 5, 3):
+                    line[15 + k] = mapping[checksum_segment(line[k * 5:k * 5 + 5])]
+
+
+def encode_mask_chunk(mask: IdMask, to18: bool, chunk: Tuple[int, int, int]) -> bytes:
+    """Worker entry point: encode one (chunk_index, first_rank, count) slice of a mask."""
+    _, first, count = chunk
+    return mask.encode_range(first, count, to18)
+
+
+def encode_mask_permuted_chunk(mask: IdMask, perm: FeistelPermutation, to18: bool,
+                               chunk: Tuple[int, int, int]) -> bytes:
+    """Worker entry point for a mask with --order random: ranks mapped through perm."""
+    _, first, count = chunk
+    out = []
+    for p in range(first, first + count):
+        id15 = mask.id_at(perm(p))
+        out.append(id15 + checksum_suffix(id15) if to18 else id15)
+    return b"\n".join(out) + b"\n" if out else b""
+
+
+# ---- Output writers ----
+class BlockWriter:
+    """
+    Single background writer for pre-joined byte blocks.
+
+    The hand-off queue is bounded in bytes rather than items: put() blocks while
+    more than `max_pending` bytes are waiting. The writer thread drains all
+    queued blocks at once, coalesces them into writes of up to `io_buffer` bytes
+    and issues them with os.write on the raw file descriptor. A write error is
+    re-raised in the producer on its next put() and by close().
+
+    `truncate_at` keeps the first bytes of an existing file and continues
+    writing after them (used by --resume); `position` is the file offset
+    reached by everything written so far.
+    """
+
+    def __init__(self, path: str, io_buffer: int = DEFAULT_IO_BUFFER,
+                 max_pending: int = DEFAULT_QUEUE_BYTES, truncate_at: int = 0):
+        self.path = path
+        self.io_buffer = max(1, io_buffer)
+        self.max_pending = max(1, max_pending)
+        self.position = truncate_at
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        os.ftruncate(self._fd, truncate_at)
+        os.lseek(self._fd, truncate_at, os.SEEK_SET)
+        self._blocks = collections.deque()
+        self._pending = 0
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, block) -> None:
+        """Queue one block (bytes-like); waits while the byte budget is exhausted."""
+        size = len(block)
+        if not size:
+            return
+        with self._cond:
+            while self._pending and self._pending + size > self.max_pending and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+            self._blocks.append(block)
+            self._pending += size
+            self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Wait until every queued block has been handed to the OS."""
+        with self._cond:
+            while self._pending and self._error is None:
+                self._cond.wait()
+            if self._error is not None:
+                raise self._error
+
+    def close(self) -> None:
+        """Flush everything queued, stop the writer thread and close the file."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        os.close(self._fd)
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self) -> "BlockWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._blocks and not self._closed:
+                    self._cond.wait()
+                if not self._blocks:
+                    return
+                batch = list(self._blocks)
+                self._blocks.clear()
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                with self._cond:
+                    self._error = e
+                    self._blocks.clear()
+                    self._pending = 0
+                    self._cond.notify_all()
+                return
+            with self._cond:
+                self._pending -= sum(len(b) for b in batch)
+                self._cond.notify_all()
+
+    def _write_batch(self, batch) -> None:
+        group, group_size = [], 0
+        for block in batch:
+            if group and group_size + len(block) > self.io_buffer:
+                self._write_all(b"".join(group))
+                group, group_size = [], 0
+            group.append(block)
+            group_size += len(block)
+        if group:
+            self._write_all(group[0] if len(group) == 1 else b"".join(group))
+
+    def _write_all(self, data) -> None:
+        view = memoryview(data).cast("B")
+        while view:
+            n = os.write(self._fd, view)
+            self.position += n
+            view = view[n:]
+
+
+def compressor_for(path: str):
+    """
+    Block compression function for the output extension (.gz/.bz2/.xz), or None
+    for plain text. Each call yields a complete stream (a gzip member, bz2 or xz
+    stream); concatenations of those are valid files for the stdlib readers.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".gz":
+        return functools.partial(gzip.compress, compresslevel=6)
+    if ext == ".bz2" and bz2 is not None:
+        return bz2.compress
+    if ext == ".xz" and lzma is not None:
+        return lzma.compress
+    if ext in (".bz2", ".xz"):
+        raise ValueError(f"Python was built without support for {ext} files")
+    return None
+
+
+class CompressedWriter:
+    """
+    Compressing block sink. Incoming blocks are gathered into COMPRESS_BLOCK
+    sized pieces that are compressed independently in a process pool; finished
+    members are written in submission order by a BlockWriter, so compression
+    scales with cores instead of becoming a single-threaded bottleneck.
+    """
+
+    def __init__(self, path: str, compress: Callable[[bytes], bytes], workers: int = None,
+                 io_buffer: int = DEFAULT_IO_BUFFER, block_size: int = COMPRESS_BLOCK,
+                 max_pending: int = DEFAULT_QUEUE_BYTES):
+        self.path = path
+        self.block_size = block_size
+        self._compress = compress
+        self._workers = workers or os.cpu_count() or 1
+        # Each pending member holds its input and (at most) an equally sized output
+        self._max_members = max(1, min(self._workers * 2, max_pending // (2 * block_size)))
+        self._raw = BlockWriter(path, io_buffer=io_buffer, max_pending=max_pending)
+        self._buf = bytearray()
+        self._fifo = collections.deque()
+        self._exe = concurrent.futures.ProcessPoolExecutor(max_workers=self._workers,
+                                                           initializer=ignore_sigint)
+
+    def put(self, block) -> None:
+        self._buf += memoryview(block)  # blocks may be NumPy arrays (--numpy)
+        if len(self._buf) >= self.block_size:
+            self._submit()
+
+    def close(self) -> None:
+        try:
+            if self._buf:
+                self._submit()
+            while self._fifo:
+                self._raw.put(self._fifo.popleft().result())
+        finally:
+            self._exe.shutdown()
+            self._raw.close()
+
+    def __enter__(self) -> "CompressedWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _submit(self) -> None:
+        data, self._buf = bytes(self._buf), bytearray()
+        self._fifo.append(self._exe.submit(self._compress, data))
+        while len(self._fifo) > self._max_members:
+            self._raw.put(self._fifo.popleft().result())
+
+
+def open_block_writer(path: str, io_buffer: int = DEFAULT_IO_BUFFER,
+                      max_pending: int = DEFAULT_QUEUE_BYTES):
+    """Text output sink for path: compressed by extension, else a plain BlockWriter."""
+    compress = compressor_for(path)
+    if compress is not None:
+        return CompressedWriter(path, compress, io_buffer=io_buffer, max_pending=max_pending)
+    return BlockWriter(path, io_buffer=io_buffer, max_pending=max_pending)
+
+
+class StdoutWriter:
+    """
+    Block sink for --displayonly: writes pre-encoded blocks straight to the
+    binary stdout buffer (no per-line print/encode). With `line_buffered`, every
+    line is flushed as soon as it is written, for interactive use.
+    """
+
+    def __init__(self, line_buffered: bool = False):
+        self.line_buffered = line_buffered
+        self._out = sys.stdout.buffer
+
+    def put(self, block) -> None:
+        if not self.line_buffered:
+            self._out.write(block)
+            return
+        for line in bytes(block).splitlines(keepends=True):
+            self._out.write(line)
+            self._out.flush()
+
+    def close(self) -> None:
+        self._out.flush()
+
+    def __enter__(self) -> "StdoutWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def silence_broken_stdout() -> None:
+    """
+    After the stdout consumer went away (BrokenPipeError), point stdout at
+    devnull so the interpreter's final flush does not raise again.
+    """
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.close(devnull)
+
+
+# Offset-addressed output: every line has the same width, so the position of
+# the i-th ID in the file is i * width and workers can write chunks in place.
+_SHARED_MMAPS = {}
+_SHARED_MMAPS_LOCK = threading.Lock()
+
+
+def line_width(to18: bool) -> int:
+    """Bytes per output line including the newline (16 or 19)."""
+    return 19 if to18 else 16
+
+
+def preallocate_output(path: str, size: int) -> None:
+    """Create/truncate path and reserve `size` bytes for offset-addressed writes."""
+    with open(path, "wb") as f:
+        f.truncate(size)
+        if hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(f.fileno(), 0, size)
+            except OSError:
+                pass  # filesystem without fallocate support; the sparse file still works
+
+
+def shared_mmap(path: str) -> mmap.mmap:
+    """Writable mapping of a preallocated file, opened once per process."""
+    with _SHARED_MMAPS_LOCK:
+        mm = _SHARED_MMAPS.get(path)
+        if mm is None:
+            with open(path, "r+b") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE)
+            _SHARED_MMAPS[path] = mm
+        return mm
+
+
+def close_shared_mmaps() -> None:
+    """Flush and unmap every mapping opened by shared_mmap in this process."""
+    with _SHARED_MMAPS_LOCK:
+        for mm in _SHARED_MMAPS.values():
+            mm.flush()
+            mm.close()
+        _SHARED_MMAPS.clear()
+
+
+def write_chunk_mmap(path: str, chunk_size: int, width: int,
+                     encode: Callable[[Tuple[int, int, int]], bytes],
+                     chunk: Tuple[int, int, int]) -> int:
+    """
+    Worker entry point for --mmap: encode one chunk and copy it into the mapped
+    output file at its precomputed offset (every chunk before the last one is
+    full, so chunk i starts at line i * chunk_size). Returns the chunk index.
+    """
+    block = encode(chunk)
+    offset = chunk[0] * chunk_size * width
+    shared_mmap(path)[offset:offset + len(block)] = block
+    return chunk[0]
+
+
+def tag_chunk(encode: Callable[[Tuple[int, int, int]], bytes],
+              chunk: Tuple[int, int, int]) -> Tuple[int, bytes]:
+    """Worker entry point that returns (chunk_index, block) for checkpointed runs."""
+    return chunk[0], encode(chunk)
+
+
+def parse_size(s: str) -> int:
+    """Parse a byte size such as 65536, 512K, 64M or 2G (binary multiples)."""
+    units = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    text = s.strip().upper().rstrip("B") or "0"
+    suffix = text[-1] if text[-1] in units else ""
+    try:
+        value = int(text[:-1] if suffix else text) * units[suffix]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid size: {s!r}")
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"Size must be positive: {s!r}")
+    return value
+
+
+# ---- Bulk line processing (files / stdin) ----
+def open_compressed_input(path: str):
+    """Binary read stream for a .gz/.bz2/.xz file, or None for other extensions."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".gz":
+        return gzip.open(path, "rb")
+    if ext == ".bz2" and bz2 is not None:
+        return bz2.open(path, "rb")
+    if ext == ".xz" and lzma is not None:
+        return lzma.open(path, "rb")
+    return None
+
+
+def iter_stream_chunks(stream, chunk_bytes: int) -> Iterator[Tuple[int, int, bytes]]:
+    """iter_input_chunks for a sequential binary stream (stdin, decompressor)."""
+    offset, index, carry = 0, 0, b""
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        data = carry + data
+        cut = data.rfind(b"\n") + 1
+        if not cut:
+            carry = data
+            continue
+        carry = data[cut:]
+        yield index, offset, data[:cut]
+        offset += cut
+        index += 1
+    if carry:
+        yield index, offset, carry
+
+
+def iter_input_chunks(path: str, chunk_bytes: int) -> Iterator[Tuple[int, int, bytes]]:
+    """
+    Split a text file (memory-mapped; .gz/.bz2/.xz decompressed as a stream)
+    or stdin ("-") into chunks of roughly `chunk_bytes` that end on a line
+    boundary. Yields (index, byte_offset, data); offsets are in the text.
+    """
+    if path == "-":
+        yield from iter_stream_chunks(sys.stdin.buffer, chunk_bytes)
+        return
+    stream = open_compressed_input(path)
+    if stream is not None:
+        with stream:
+            yield from iter_stream_chunks(stream, chunk_bytes)
+        return
+
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    with mm:
+        offset, index = 0, 0
+        while offset < size:
+            end = min(size, offset + chunk_bytes)
+            if end < size:
+                nl = mm.find(b"\n", end - 1)
+                end = size if nl == -1 else nl + 1
+            yield index, offset, mm[offset:end]
+            offset = end
+            index += 1
+
+
+def decode_counter(id15: bytes) -> int:
+    """Decode the 8-char base62 counter of a validated 15-byte ID."""
+    p = _B62_PAIRS
+    return ((p[id15[7:9]] * 3844 + p[id15[9:11]]) * 3844 + p[id15[11:13]]) * 3844 + p[id15[13:15]]
+
+
+def analyze_chunk(chunk: Tuple[int, int, bytes]) -> bytes:
+    """
+    Worker entry point for bulk-decode: one tab-separated record per input ID:
+    input, id15, id18, prefix, instance, reserved, counter, checksum, where
+    checksum is valid/invalid for 18-char input, n/a for 15-char input and
+    error (other fields empty) for malformed lines. Blank lines are skipped.
+    """
+    out = []
+    for raw in chunk[2].split(b"\n"):
+        sfid = raw.strip()
+        if not sfid:
+            continue
+        n = len(sfid)
+        if (n != 15 and n != 18) or sfid.translate(None, _ALPHABET_BYTES):
+            out.append(sfid + b"\t\t\t\t\t\t\terror")
+            continue
+        id15 = sfid[:15]
+        suffix = checksum_suffix(id15)
+        if n == 15:
+            status = b"n/a"
+        else:
+            status = b"valid" if sfid[15:] == suffix else b"invalid"
+        out.append(b"\t".join((sfid, id15, id15 + suffix, id15[:3], id15[3:6], id15[6:7],
+                               b"%d" % decode_counter(id15), status)))
+    return b"\n".join(out) + b"\n" if out else b""
+
+
+REPAIR_KINDS = ("valid", "upgraded", "repaired", "case-restored", "irreparable")
+
+
+def repair_chunk(chunk: Tuple[int, int, bytes]) -> Tuple[bytes, Tuple[int, ...], list]:
+    """
+    Worker entry point for bulk-repair: emit the checksummed 18-char form of
+    every ID. A mismatching suffix is first read case-insensitively: if it
+    restores the body's casing (restore_case), the restored ID is emitted.
+    The suffix is only recomputed from the body when the body's casing is
+    credible (mixed case, or no letters); an all-lower/all-upper body with an
+    unusable suffix is irreparable rather than guessed. Returns (block,
+    counts in REPAIR_KINDS order, [(byte_offset, line), ...] of irreparable
+    lines); blank lines are skipped.
+    """
+    _, offset, data = chunk
+    out, rejects = [], []
+    valid = upgraded = repaired = restored = 0
+    for raw in data.split(b"\n"):
+        sfid = raw.strip()
+        if sfid:
+            n = len(sfid)
+            id15 = sfid[:15]
+            if (n != 15 and n != 18) or id15.translate(None, _ALPHABET_BYTES):
+                rejects.append((offset, raw.rstrip(b"\r")))
+            else:
+                suffix = checksum_suffix(id15)
+                if n == 15:
+                    upgraded += 1
+                    out.append(id15 + suffix)
+                elif sfid[15:] == suffix:
+                    valid += 1
+                    out.append(id15 + suffix)
+                else:
+                    try:
+                        original = restore_case(sfid)
+                    except ValueError:
+                        original = None
+                    if original == id15 or not (id15.islower() or id15.isupper()):
+                        # Body casing is right (or credible); only the suffix was damaged
+                        repaired += 1
+                        out.append(id15 + suffix)
+                    elif original is not None:
+                        # The body lost its casing; the suffix still records it
+                        restored += 1
+                        out.append(original + checksum_suffix(original))
+                    else:
+                        rejects.append((offset, raw.rstrip(b"\r")))
+        offset += len(raw) + 1
+    block = b"\n".join(out) + b"\n" if out else b""
+    return block, (valid, upgraded, repaired, restored, len(rejects)), rejects
+
+
+class BulkReport:
+    """Collects per-kind counts of a bulk mode and reports rejected lines on stderr."""
+
+    def __init__(self, kinds: Tuple[str, ...]):
+        self.kinds = kinds
+        self.counts = [0] * len(kinds)
+
+    def collect(self, results: Iterable[Tuple[bytes, Tuple[int, ...], list]]) -> Iterator[bytes]:
+        for block, counts, rejects in results:
+            for i, c in enumerate(counts):
+                self.counts[i] += c
+            for offset, line in rejects:
+                text = line.decode("ascii", "replace")
+                print(f"Irreparable line at byte offset {offset}: {text!r}", file=sys.stderr)
+            yield block
+
+    def summary(self) -> None:
+        print(", ".join(f"{kind}: {c}" for kind, c in zip(self.kinds, self.counts)),
+              file=sys.stderr)
+
+
+# ---- Exclusion sets ----
+# A 15- or 18-char alphanumeric token (an ID inside a log line, CSV field, URL...)
+_ID_TOKEN = re.compile(rb"(?<![0-9A-Za-z])[0-9A-Za-z]{15}(?:[0-9A-Za-z]{3})?(?![0-9A-Za-z])")
+EXCLUDE_CHUNK = 4 << 20  # bytes of exclusion text scanned per batch
+
+
+class CounterSlabs:
+    """
+    Unsorted counters kept compactly: one array('Q') (8 bytes per counter)
+    made of slabs, each sorted when it is added. merged() yields all of them
+    in ascending order, sorting the array in place with NumPy when it is
+    installed and k-way merging the slabs otherwise, so the counters never
+    exist as a list of Python ints.
+    """
+
+    __slots__ = ("values", "bounds")
+
+    def __init__(self):
+        self.values = array.array("Q")
+        self.bounds = [0]
+
+    def add(self, counters: Iterable[int]) -> None:
+        """Append one slab (sorted here, so batches may come in any order)."""
+        slab = sorted(counters)
+        if slab:
+            self.values.extend(slab)
+            self.bounds.append(len(self.values))
+
+    def merged(self) -> Iterator[int]:
+        values, bounds = self.values, self.bounds
+        if len(bounds) <= 2:
+            return iter(values)
+        if np is not None:
+            np.frombuffer(values, dtype=np.uint64).sort()
+            return iter(values)
+        view = memoryview(values)
+        return heapq.merge(*(view[lo:hi] for lo, hi in zip(bounds, bounds[1:])))
+
+
+def read_binary_exclusions(path: str, prefix7: str, slabs: CounterSlabs) -> IdRange:
+    """
+    The IDs of a .sfidb file (nothing if its prefix is not prefix7): stored
+    runs are returned as an IdRange, the counters of a packed file (in
+    permuted order) are added to `slabs` in 1M-counter batches.
+    """
+    with BinaryIdReader(path) as reader:
+        if reader.prefix7 != prefix7:
+            return IdRange()
+        payload, step = reader.payload, reader.step
+        if reader.packed:
+            for n in range(0, reader.records, 1 << 20):
+                slabs.add(payload[n:n + (1 << 20)])
+            return IdRange()
+        return IdRange((first, first + (length - 1) * step) if step > 0 else (first - length + 1, first)
+                       for first, length in zip(payload[0::2], payload[1::2]))
+
+
+def load_exclusions(paths: Iterable[str], prefixes: Iterable[str]) -> dict:
+    """
+    Collect the IDs found in `paths` whose prefix7 is one of `prefixes` into
+    {prefix7: IdRange}. Text files (plain, .gz/.bz2/.xz, or - for stdin) are
+    scanned for 15/18-char tokens in EXCLUDE_CHUNK batches; each batch's
+    counters become one sorted CounterSlabs slab per prefix (8 bytes per ID),
+    and all slabs are merged once at the end and collapsed into runs in a
+    single pass, so unsorted input (Burp logs) costs O(n log n). Packed
+    .sfidb files are read the same way; run .sfidb files add their runs.
+    """
+    slabs = {p.encode("ascii"): CounterSlabs() for p in prefixes}
+    stored = {p: IdRange() for p in slabs}
+    for path in paths:
+        if path.lower().endswith(".sfidb"):
+            for p, found in slabs.items():
+                stored[p] |= read_binary_exclusions(path, p.decode("ascii"), found)
+            continue
+        for _, _, data in iter_input_chunks(path, EXCLUDE_CHUNK):
+            batch = {p: [] for p in slabs}
+            for token in _ID_TOKEN.findall(data):
+                counters = batch.get(token[:COUNTER_POS])
+                if counters is not None:
+                    counters.append(decode_counter(token[:15]))
+            for p, counters in batch.items():
+                slabs[p].add(counters)
+    result = {}
+    for p in list(slabs):
+        rng = IdRange._from_counters(slabs.pop(p).merged())
+        result[p.decode("ascii")] = rng | stored[p] if stored[p] else rng
+    return result
+
+
+# ---- Case recovery ----
+# Checksum char -> 5-bit uppercase bitmap of its segment (the inverse of _MAPPING)
+_UNMAPPING = {c: i for i, c in enumerate(_MAPPING_BYTES)}
+_LETTERS = frozenset(ALPHABET[10:].encode("ascii"))
+CASE_KINDS = ("restored", "expanded", "candidates", "irreparable")
+
+
+def parse_counter_range(s: str) -> Tuple[int, int]:
+    """Parse --counter-range LO-HI (inclusive record numbers) into (lo, hi)."""
+    try:
+        lo, hi = (int(x) for x in s.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid counter range {s!r}; expected LO-HI, e.g. 366000000-367000000")
+    if not 0 <= lo <= hi <= MAX_BASE62_8:
+        raise argparse.ArgumentTypeError(f"Invalid counter range {s!r}; need 0 <= LO <= HI <= {MAX_BASE62_8}")
+    return lo, hi
+
+
+def load_prefixes(path: str) -> Tuple[str, ...]:
+    """Read a known-prefix table: one case-sensitive prefix (1..7 chars) per line."""
+    try:
+        with open(path, "r", encoding="ascii") as f:
+            prefixes = tuple(sorted({line.strip() for line in f if line.strip()}))
+    except (OSError, UnicodeDecodeError) as e:
+        raise argparse.ArgumentTypeError(f"Cannot read prefix table {path!r}: {e}")
+    bad = [p for p in prefixes if len(p) > COUNTER_POS or p.strip(ALPHABET)]
+    if bad or not prefixes:
+        raise argparse.ArgumentTypeError(
+            f"Invalid prefix table {path!r}; expected base62 prefixes of 1..7 chars, got {bad[:3]}")
+    return prefixes
+
+
+def restore_case(sfid18: bytes) -> bytes:
+    """
+    Restore the original casing of an any-case 18-char ID from its checksum
+    suffix: each suffix char is the uppercase bitmap of one 5-char segment.
+    Returns the 15-char ID; raises ValueError if the suffix cannot describe it.
+    """
+    body = sfid18[:15].lower()
+    try:
+        bits = [_UNMAPPING[c] for c in sfid18[15:18].upper()]
+    except KeyError:
+        raise ValueError("checksum suffix contains characters outside A-Z0-5")
+    out = bytearray(body)
+    for i in range(15):
+        if bits[i // 5] >> (i % 5) & 1:
+            if out[i] not in _LETTERS:
+                raise ValueError(f"checksum marks non-letter position {i} as uppercase")
+            out[i] -= 32
+    return bytes(out)
+
+
+def case_candidates(id15: bytes, prefixes: Tuple[str, ...] = (),
+                    lo: int = 0, hi: int = MAX_BASE62_8) -> Iterator[bytes]:
+    """
+    Lazily yield every casing of an any-case 15-char ID, in ascending ID order,
+    whose prefix starts with one of `prefixes` (when given) and whose counter
+    lies in [lo, hi]. Counter positions are chosen left to right and a branch
+    is pruned as soon as its counter interval misses [lo, hi].
+    """
+    choices = [bytes((c - 32, c)) if c in _LETTERS else bytes((c,)) for c in id15.lower()]
+    known = [p.encode("ascii") for p in prefixes]
+    heads = [bytes(h) for h in itertools.product(*choices[:COUNTER_POS])]
+    if known:
+        heads = [h for h in heads if any(h.startswith(p) for p in known)]
+    index = {c: i for i, c in enumerate(_ALPHABET_BYTES)}
+    tail = choices[COUNTER_POS:]
+    spans = [BASE ** (len(tail) - 1 - i) for i in range(len(tail))]
+
+    def walk(pos: int, value: int, acc: bytes) -> Iterator[bytes]:
+        if pos == len(tail):
+            yield acc
+            return
+        span = spans[pos]
+        for c in tail[pos]:
+            v = value * BASE + index[c]
+            # counters below this branch cover [v * span, v * span + span - 1]
+            if v * span <= hi and v * span + span - 1 >= lo:
+                yield from walk(pos + 1, v, acc + bytes((c,)))
+
+    for head in heads:
+        yield from walk(0, 0, head)
+
+
+def case_recover_chunk(chunk: Tuple[int, int, bytes], to18: bool = False,
+                       prefixes: Tuple[str, ...] = (),
+                       counter_range: Tuple[int, int] = (0, MAX_BASE62_8)
+                       ) -> Tuple[bytes, Tuple[int, ...], list]:
+    """
+    Worker entry point for case-recover: an 18-char line yields its restored
+    ID; a 15-char line yields all its pruned casings (see case_candidates).
+    Returns (block, counts in CASE_KINDS order, [(byte_offset, line), ...]).
+    """
+    _, offset, data = chunk
+    lo, hi = counter_range
+    out, rejects = [], []
+    restored = expanded = candidates = 0
+    for raw in data.split(b"\n"):
+        sfid = raw.strip()
+        if sfid:
+            n = len(sfid)
+            found = []
+            if (n == 15 or n == 18) and not sfid[:15].translate(None, _ALPHABET_BYTES):
+                if n == 18:
+                    try:
+                        found = [restore_case(sfid)]
+                    except ValueError:
+                        pass
+                else:
+                    found = list(case_candidates(sfid, prefixes, lo, hi))
+            if not found:
+                rejects.append((offset, raw.rstrip(b"\r")))
+            else:
+                if n == 18:
+                    restored += 1
+                else:
+                    expanded += 1
+                    candidates += len(found)
+                out.extend(f + checksum_suffix(f) if to18 else f for f in found)
+        offset += len(raw) + 1
+    block = b"\n".join(out) + b"\n" if out else b""
+    return block, (restored, expanded, candidates, len(rejects)), rejects
+
+
+# ---- Sharded output (numbered files + manifest) ----
+def shard_path(path: str, index: int) -> str:
+    """ids.txt -> ids.00003.txt, ids.txt.gz -> ids.00003.txt.gz"""
+    base, ext = os.path.splitext(path)
+    if compressor_for(path) is not None:
+        base, inner = os.path.splitext(base)
+        ext = inner + ext
+    return f"{base}.{index:05d}{ext}"
+
+
+def manifest_path(path: str) -> str:
+    """Manifest written next to the shards: ids.txt -> ids.manifest.json"""
+    base = path
+    while True:
+        base, ext = os.path.splitext(base)
+        if not ext or compressor_for(base + ext) is None:
+            break
+    return f"{base}.manifest.json"
+
+
+def write_shard(path: str, encode: Callable[[Tuple[int, int, int]], bytes], step: int,
+                chunk_size: int, shard: Tuple[int, int, int]) -> dict:
+    """
+    Worker entry point for --split-*: generate one shard's counter range into its
+    own numbered file (compressed by extension) and return its manifest entry.
+    """
+    index, first, count = shard
+    out_path = shard_path(path, index)
+    compress = compressor_for(path)
+    digest = hashlib.sha256()
+    size = 0
+    with open(out_path, "wb") as f:
+        for chunk in gen_chunk_ranges(first, count * step, chunk_size):
+            data = encode(chunk)
+            if compress is not None:
+                data = compress(bytes(data))
+            f.write(data)
+            digest.update(data)
+            size += len(data)
+    return {
+        "index": index,
+        "file": os.path.basename(out_path),
+        "first": first,
+        "last": first + (count - 1) * step,
+        "count": count,
+        "bytes": size,
+        "sha256": digest.hexdigest(),
+    }
+
+
+def write_manifest(path: str, header: dict, shards: Iterable[dict]) -> str:
+    """Write the JSON shard manifest (shards sorted by index); returns its path."""
+    out = manifest_path(path)
+    doc = dict(header, shards=sorted(shards, key=lambda e: e["index"]))
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(doc, f, indent=2)
+        f.write("\n")
+    return out
+
+
+# ---- Checkpoint / resume ----
+CHECKPOINT_VERSION = 1
+CHECKPOINT_INTERVAL = 5.0  # seconds between periodic checkpoints
+
+
+class Checkpoint:
+    """
+    Progress of a resumable run, persisted as JSON next to the output file
+    (<outfile>.ckpt). It records the run parameters, the output byte offset
+    and the completed chunks as a high-water mark (every chunk below `hwm` is
+    done) plus a zlib-compressed bitmap of the completed chunks above it.
+    """
+
+    def __init__(self, path: str, params: dict):
+        self.path = path
+        self.params = params
+        self.offset = 0
+        self.hwm = 0
+        self._bits = bytearray()
+
+    @classmethod
+    def load(cls, path: str) -> "Checkpoint":
+        with open(path, "r", encoding="utf-8") as f:
+            doc = json.load(f)
+        if doc.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"{path}: unsupported checkpoint version")
+        ckpt = cls(path, doc["params"])
+        ckpt.offset = doc["offset"]
+        base = doc["hwm"] // 8
+        ckpt._bits = bytearray(b"\xff" * base) + zlib.decompress(base64.b64decode(doc["bitmap"]))
+        ckpt.hwm = doc["hwm"]
+        return ckpt
+
+    def is_done(self, index: int) -> bool:
+        if index < self.hwm:
+            return True
+        byte = index >> 3
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << (index & 7)))
+
+    def mark(self, index: int) -> None:
+        byte = index >> 3
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte - len(self._bits) + 1))
+        self._bits[byte] |= 1 << (index & 7)
+        while self.is_done(self.hwm):
+            self.hwm += 1
+
+    def save(self) -> None:
+        """Atomically replace the checkpoint file."""
+        base = self.hwm // 8
+        doc = {
+            "version": CHECKPOINT_VERSION,
+            "params": self.params,
+            "offset": self.offset,
+            "hwm": self.hwm,
+            "bitmap": base64.b64encode(zlib.compress(bytes(self._bits[base:]))).decode("ascii"),
+        }
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(doc, f)
+        os.replace(tmp, self.path)
+
+    def remove(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def checkpoint_path(outfile: str) -> str:
+    return outfile + ".ckpt"
+
+
+def open_checkpoint(outfile: str, params: dict, resume: bool) -> Checkpoint:
+    """Fresh checkpoint, or (with resume) the saved one after checking it matches params."""
+    path = checkpoint_path(outfile)
+    if not resume:
+        return Checkpoint(path, params)
+    if not os.path.exists(path):
+        raise ValueError(f"No checkpoint found at '{path}'")
+    ckpt = Checkpoint.load(path)
+    if ckpt.params != params:
+        raise ValueError(f"Checkpoint '{path}' was written for different arguments")
+    if not os.path.exists(outfile) or os.path.getsize(outfile) < ckpt.offset:
+        raise ValueError(f"Output file '{outfile}' is missing or shorter than the checkpoint")
+    return ckpt
+
+
+# ---- Binary ID format (.sfidb) ----
+# Little-endian layout, 8-byte aligned so the payload can be mapped zero-copy:
+#   0  magic   b"SFID"           4  version u8      5  flags u8     6  reserved u16
+#   8  prefix7 (7 ASCII bytes + NUL pad)
+#   16 count   u64  total number of IDs
+#   24 records u64  number of payload records
+#   32 payload: runs    -> records x (first u64, length u64), IDs first, first+step, ...
+#               packed  -> records x counter u64, one per ID
+BIN_MAGIC = b"SFID"
+BIN_VERSION = 1
+BIN_HEADER = struct.Struct("<4sBBH8sQQ")
+BIN_FLAG_18 = 0x01  # expand to 18-char IDs
+BIN_FLAG_DESC = 0x02  # runs count downwards
+BIN_FLAG_PACKED = 0x04  # payload is one counter per ID instead of runs
+
+
+def _le_array(values: Iterable[int]) -> array.array:
+    """array('Q') in little-endian byte order regardless of the host."""
+    arr = array.array("Q", values)
+    if sys.byteorder == "big":
+        arr.byteswap()
+    return arr
+
+
+class BinaryIdWriter:
+    """
+    Writes a .sfidb file. Contiguous output is stored as (first, length) runs
+    (adjacent runs are merged, so a whole efv/efc sweep is a single 16-byte
+    record); with `packed`, every counter is stored as a fixed-width u64.
+    """
+
+    def __init__(self, path: str, prefix7: str, to18: bool, descending: bool = False,
+                 packed: bool = False):
+        self.path = path
+        self.prefix7 = prefix7
+        self.flags = ((BIN_FLAG_18 if to18 else 0) | (BIN_FLAG_DESC if descending else 0)
+                      | (BIN_FLAG_PACKED if packed else 0))
+        self.step = -1 if descending else 1
+        self.count = 0
+        self.records = 0
+        self._run = None  # pending [first, length] not yet flushed
+        self._f = open(path, "wb")
+        self._f.write(b"\0" * BIN_HEADER.size)
+
+    def add_run(self, first: int, length: int) -> None:
+        """Append `length` consecutive counters starting at `first` (in file direction)."""
+        if length <= 0:
+            return
+        if self.flags & BIN_FLAG_PACKED:
+            self.add_counters(range(first, first + length * self.step, self.step))
+            return
+        self.count += length
+        run = self._run
+        if run is not None and run[0] + run[1] * self.step == first:
+            run[1] += length
+            return
+        self._flush_run()
+        self._run = [first, length]
+
+    def add_counters(self, counters: Iterable[int]) -> None:
+        """Append individual counters (packed files only)."""
+        if not self.flags & BIN_FLAG_PACKED:
+            raise ValueError("add_counters requires a packed writer")
+        arr = _le_array(counters)
+        arr.tofile(self._f)
+        self.count += len(arr)
+        self.records += len(arr)
+
+    def close(self) -> None:
+        """Flush the pending run and finalize the header."""
+        self._flush_run()
+        self._f.seek(0)
+        self._f.write(BIN_HEADER.pack(BIN_MAGIC, BIN_VERSION, self.flags, 0,
+                                      self.prefix7.encode("ascii"), self.count, self.records))
+        self._f.close()
+
+    def __enter__(self) -> "BinaryIdWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _flush_run(self) -> None:
+        if self._run is not None:
+            _le_array(self._run).tofile(self._f)
+            self.records += 1
+            self._run = None
+
+
+class BinaryIdReader:
+    """
+    Random-access reader for .sfidb files. The file is memory-mapped and the
+    payload exposed as a zero-copy u64 view; counter(n) is O(1) for packed files
+    and single-run files (O(log runs) otherwise).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < BIN_HEADER.size:
+            raise ValueError(f"{path}: not a Salesforce ID binary file")
+        magic, version, flags, _, prefix, self.count, self.records = BIN_HEADER.unpack_from(self._mm)
+        if magic != BIN_MAGIC or version != BIN_VERSION:
+            raise ValueError(f"{path}: not a Salesforce ID binary file (version {BIN_VERSION})")
+        self.prefix7 = prefix[:7].decode("ascii")
+        self.to18 = bool(flags & BIN_FLAG_18)
+        self.step = -1 if flags & BIN_FLAG_DESC else 1
+        self.packed = bool(flags & BIN_FLAG_PACKED)
+        words = self.records * (1 if self.packed else 2)
+        if len(self._mm) < BIN_HEADER.size + words * 8:
+            raise ValueError(f"{path}: truncated payload")
+        payload = memoryview(self._mm)[BIN_HEADER.size:BIN_HEADER.size + words * 8]
+        if sys.byteorder == "big":  # rare: take a swapped copy instead of a view
+            arr = array.array("Q", payload.tobytes())
+            arr.byteswap()
+            payload = memoryview(arr)
+        self.payload = payload.cast("Q")
+        if not self.packed:
+            # starts[i] = index of the first ID of run i
+            self._starts = array.array("Q", itertools.accumulate(
+                itertools.chain((0,), self.payload[1::2][:-1])))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def counter(self, n: int) -> int:
+        """Counter value of the n-th ID (0-based)."""
+        if not 0 <= n < self.count:
+            raise IndexError("ID index out of range")
+        if self.packed:
+            return self.payload[n]
+        r = bisect.bisect_right(self._starts, n) - 1
+        return self.payload[2 * r] + (n - self._starts[r]) * self.step
+
+    def id(self, n: int) -> str:
+        """The n-th Salesforce ID as text."""
+        return make_id(self.prefix7, self.counter(n), self.to18)[0]
+
+    def iter_text_blocks(self, start: int = 0, stop: int = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream IDs [start, stop) back as newline-terminated text blocks."""
+        stop = self.count if stop is None else min(stop, self.count)
+        n = max(0, start)
+        while n < stop:
+            if self.packed:
+                end = min(stop, n + chunk_size)
+                yield encode_values(self.prefix7, self.payload[n:end], self.to18)
+            else:
+                r = bisect.bisect_right(self._starts, n) - 1
+                offset = n - self._starts[r]
+                end = min(stop, n + chunk_size, self._starts[r] + self.payload[2 * r + 1])
+                first = self.payload[2 * r] + offset * self.step
+                yield encode_range(self.prefix7, first, end - n, self.step, self.to18)
+            n = end
+
+    def close(self) -> None:
+        self.payload.release()
+        self._mm.close()
+
+    def __enter__(self) -> "BinaryIdReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def default_output_filename(script_name: str, ext: str = ".txt") -> str:
+    stem = os.path.splitext(os.path.basename(script_name))[0] or "sfid-tool"
+    ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    return f"{stem}-{ts}{ext}"
+
+
+def write_results_ids(path: str, ids_only: Iterable[str]) -> None:
+    """Write only the Salesforce IDs, one per line (no header, no extras)."""
+    with open(path, "w", encoding="utf-8") as f:
+        for sfid_out in ids_only:
+            f.write(f"{sfid_out}\n")
+
+
+MODE_CHOICES = ("decode|d, enum-from-value|efv, enum-from-current|efc, expand|x, "
+                "bulk-decode|bd, bulk-repair|br, case-recover|cr, multi-seed|ms, spiral|sp, mask|mk")
+
+
+def normalize_mode(s: str) -> str:
+    """Normalize mode value and support aliases d/efv/efc/x/bd/br/cr/ms/sp/mk (case-insensitive)."""
+    if not s:
+        raise argparse.ArgumentTypeError("Mode is required.")
+    m = s.strip().lower()
+    aliases = {
+        "decode": "decode",
+        "d": "decode",
+        "enum-from-value": "enum-from-value",
+        "efv": "enum-from-value",
+        "enum-from-current": "enum-from-current",
+        "efc": "enum-from-current",
+        "expand": "expand",
+        "x": "expand",
+        "bulk-decode": "bulk-decode",
+        "bd": "bulk-decode",
+        "bulk-repair": "bulk-repair",
+        "br": "bulk-repair",
+        "case-recover": "case-recover",
+        "cr": "case-recover",
+        "multi-seed": "multi-seed",
+        "ms": "multi-seed",
+        "spiral": "spiral",
+        "sp": "spiral",
+        "mask": "mask",
+        "mk": "mask",
+    }
+    if m not in aliases:
+        raise argparse.ArgumentTypeError(f"Invalid --mode. Use one of: {MODE_CHOICES}")
+    return aliases[m]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    epilog = dedent("""
+    EXAMPLES
+      Decode the record counter (prints integer):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m d
+
+      Enumerate from an integer value upward (IDs saved to default file, no console output):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 366897425 --seq 10
+
+      Enumerate downward 5 from the current ID value (print only, 18-char IDs):
+        sfid_tool.py -i 001Vc00000PHoN1 -m efc --seq -5 --displayonly --to18
+
+      Fixing the 3 last characters to make a valid 18-char ID:
+        sfid_tool.py -i 001Vc00000PHoN1 -m efc --seq 1 --displayonly --to18
+
+      Force sequential order (threads=1) and write to custom file:
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efc --seq 100 --threads 1 --outfile out.txt
+
+      Large parallel enumeration (order not guaranteed; file is written safely):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 500000 --threads 100
+
+      Parallel enumeration in counter order (same bytes as --threads 1):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 500000 --ordered
+
+      Parallel, in-order enumeration written in place into a memory-mapped file:
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 50000000 --backend process --mmap
+
+      CPU-bound enumeration across all cores (one worker process per core):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 50000000 --backend process
+
+      Compact binary output (a contiguous sweep is stored as a single run):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 500000000 --format binary --outfile ids.sfidb
+
+      Compressed output (format chosen by extension: .gz, .bz2 or .xz; compressed on all cores):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 50000000 --backend process --outfile ids.txt.gz
+
+      Split into shards of 1M IDs (ids.00000.txt, ...) written in parallel, with ids.manifest.json:
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 50000000 --backend process --split-count 1000000 --outfile ids.txt
+
+      Split one sweep across 4 hosts (this host generates the 2nd quarter):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 100000000 --shard 2/4 --outfile part2.txt
+
+      Resumable run (Ctrl+C saves a checkpoint; re-run with --resume to continue):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 500000000 --checkpoint --outfile ids.txt
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 500000000 --resume --outfile ids.txt
+
+      Bulk-decode an ID dump (or stdin with --infile -); one tab-separated record per ID:
+        sfid_tool.py -m bd --infile ids.txt --backend process --outfile decoded.tsv
+
+      Upgrade/repair a mixed ID list to valid 18-char IDs (bad lines reported on stderr):
+        sfid_tool.py -m br --infile evidence.txt --outfile fixed.txt
+
+      Restore IDs that lost their casing (18-char: exact; 15-char: pruned candidate list):
+        sfid_tool.py -m cr --infile lowercased.txt --prefixes prefixes.txt --counter-range 366000000-367000000
+
+      +/-5000 around every seed ID, overlapping windows merged (each ID once):
+        sfid_tool.py -m ms --infile seeds.txt --window 5000 --ordered --to18 --outfile around.txt
+
+      Every ID of a range exactly once, in a reproducible pseudo-random order, split across 4 hosts:
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --start 0 --seq 100000000 --order random --key k1 --shard 1/4
+
+      Several ranges in one pass (absolute, +500 from another ID, +/-200 around -i):
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efv --range 366897000-366898000,+500@001Vc00000PHoN5,~200 --ordered
+
+      Re-run a sweep, skipping IDs already in earlier outputs and a Burp log:
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m efc --seq 1000000 --exclude run1.txt.gz run2.sfidb burp.xml
+
+      Every ID matching a mask (wildcard counter chars, custom-object prefixes a0?):
+        sfid_tool.py -m mk --mask '001Vc00000PH???' --to18 --outfile masked.txt
+        sfid_tool.py -m mk --mask 'a0?Vc00000[0-9A-F]????' --backend process --ordered --outfile custom.txt
+
+      Nearest-first around one ID (ID, +1, -1, +2, -2, ...); 100 below and 900 above:
+        sfid_tool.py -i 001Vc00000PHoN1IAL -m sp --window 100:900 --displayonly
+
+      Export IDs 1000..1099 of a binary file as text:
+        sfid_tool.py -m x --infile ids.sfidb --skip 1000 --limit 100 --displayonly
+
+    NOTES
+      - In enum modes, nothing is printed unless --displayonly is used.
+      - decode mode prints ONLY the decoded integer.
+      - expand mode streams a binary (.sfidb) file back as text IDs (--to18 forces 18-char output).
+      - bulk-decode writes: input, id15, id18, prefix, instance, reserved, counter, checksum
+        (valid|invalid for 18-char input, n/a for 15-char input, error for malformed lines).
+      - bulk-repair writes one 18-char ID per valid input line, in input order. A suffix that still
+        encodes the casing of an upper/lowercased body restores it (case-restored); lines that are
+        malformed or cannot be repaired without guessing are dropped and reported on stderr with
+        their byte offset, followed by a summary of counts.
+      - --order random maps every position of the range through a keyed Feistel permutation
+        (O(1) per ID, no list is shuffled); --ordered then keeps the permuted order.
+      - --range terms are merged per prefix7 into disjoint intervals; --ordered output is sorted by
+        prefix7, then record number.
+      - --exclude subtracts the excluded IDs from the requested intervals; the remaining IDs are
+        generated in ascending order (with --ordered) even for negative --seq.
+      - mask output is in ascending ID order (with --ordered); the number of matching IDs is printed
+        to stderr first. --seq N keeps only the first N; --shard, --mmap, --split-*, --checkpoint
+        and --order random work as for the enum modes.
+      - multi-seed groups seeds by prefix7 and merges their +/- --window ranges; --ordered output is
+        sorted by prefix7, then record number.
+      - spiral output is always nearest-first; a side stops at its budget or at 0 / 62^8-1 and the
+        other side continues alone.
+      - case-recover restores an any-case 18-char ID from its checksum suffix, and expands an any-case
+        15-char ID into every casing allowed by --prefixes/--counter-range (ascending, one per line).
+      - When not using --displayonly, results are written to a text file (IDs only, one per line).
+      - Valid base62 integer bounds for the 8-char counter: 0 .. 62^8 - 1.
+    """).strip("\n")
+
+    parser = argparse.ArgumentParser(
+        description="Salesforce ID decode/enumeration tool (base62 record number)",
+        formatter_class=argparse.RawTextHelpFormatter,
+        epilog=epilog,
+    )
+    # --id with -i short
+    parser.add_argument(
+        "-i", "--id",
+        help="Salesforce ID (15 or 18 chars); required for decode and enum modes",
+    )
+
+    # --mode with aliases
+    parser.add_argument(
+        "-m", "--mode",
+        required=True,
+        type=normalize_mode,
+        help=f"Operation mode: {MODE_CHOICES}",
+    )
+
+    # Enum parameters
+    parser.add_argument(
+        "--start",
+        type=int,
+        help="(optional) (enum-from-value) Starting integer value for 8-char base62 (0..62^8-1)",
+    )
+    parser.add_argument(
+        "--seq",
+        type=int,
+        help="Number of IDs to generate. Positive=upward, Negative=downward (required for enum modes)",
+    )
+    parser.add_argument(
+        "--mask",
+        metavar="PATTERN",
+        help="(mask) 15-position ID pattern: literal chars, ? (any base62 char) or [...] classes\n"
+             "with ranges and ^ negation, e.g. 001Vc00000PH??? or a0?Vc00000[0-9A-F]????",
+    )
+    parser.add_argument(
+        "--range",
+        metavar="EXPR",
+        help="(optional) (enum modes) Range expression replacing --start/--seq, e.g.\n"
+             "366897000-366898000,+500@001Vc00000PHoN1,~200 (A-B, V, +N, -N, ~N; @ID sets the\n"
+             "prefix/anchor, default -i); terms are merged and every ID is generated once",
+    )
+    parser.add_argument(
+        "--exclude",
+        nargs="+",
+        metavar="FILE",
+        help="(optional) (enum modes, --range, multi-seed) Skip every ID found in these files: previous\n"
+             "outputs (.txt, .gz/.bz2/.xz, .sfidb), Burp logs or any text containing 15/18-char IDs",
+    )
+    parser.add_argument(
+        "--window",
+        type=parse_window,
+        metavar="N|BELOW:ABOVE",
+        help="(multi-seed, spiral) Enumerate N IDs below and above every seed, or an asymmetric\n"
+             "BELOW:ABOVE budget (overlapping multi-seed windows are merged)",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        help="(optional) Workers for enum modes (default 50 threads, or one per core with --backend process).\n"
+             "Use 1 for strict sequential output.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default="thread",
+        help="(optional) Execution backend for enum modes: thread (default), process, sequential",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="K/N",
+        help="(optional) Generate only slice K (1..N) of N balanced, non-overlapping slices of the range",
+    )
+    parser.add_argument(
+        "--shard-mode",
+        choices=("contiguous", "interleaved"),
+        default="contiguous",
+        help="(optional) --shard partitioning: contiguous (default) slices, or interleaved round-robin\n"
+             "chunks of --chunk-size counters (all hosts must use the same --chunk-size)",
+    )
+    parser.add_argument(
+        "--order",
+        choices=("sequential", "random"),
+        default="sequential",
+        help="(optional) Visiting order of the range: sequential (default) or random, a keyed\n"
+             "pseudo-random permutation that still covers every counter exactly once",
+    )
+    parser.add_argument(
+        "--key",
+        default="0",
+        help="(optional) Permutation key for --order random; the same key reproduces the same order",
+    )
+    parser.add_argument(
+        "--ordered",
+        action="store_true",
+        help="(optional) Keep parallel output in counter order (byte-identical to --threads 1)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"(optional) Counters encoded per worker task (default {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--numpy",
+        action="store_true",
+        help="(optional) Use the NumPy vectorized encoder (falls back to pure Python if NumPy is absent)",
+    )
+    parser.add_argument(
+        "--displayonly",
+        action="store_true",
+        help="(optional) Do not write to file; only print results to stdout",
+    )
+    parser.add_argument(
+        "--line-buffered",
+        action="store_true",
+        help="(optional) With --displayonly, flush every ID as soon as it is generated",
+    )
+    parser.add_argument(
+        "--outfile",
+        help="(optional) Output filename (for enum modes). Default is <scriptname>-<timestamp>.txt",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="(optional) Preallocate the output file and let workers write their chunks in place\n"
+             "(no writer thread; output is always in counter order)",
+    )
+    parser.add_argument(
+        "--split-count",
+        type=int,
+        help="(optional) Split file output into numbered shards of N IDs each, plus a manifest",
+    )
+    parser.add_argument(
+        "--split-bytes",
+        type=parse_size,
+        help="(optional) Split file output into numbered shards of at most SIZE bytes (e.g. 100M)",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        action="store_true",
+        help="(optional) Periodically save progress to <outfile>.ckpt so an interrupted run can be resumed",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="(optional) Continue an interrupted --checkpoint run (same arguments and --outfile)",
+    )
+    parser.add_argument(
+        "--max-memory",
+        type=parse_size,
+        help="(optional) Memory budget for in-flight chunks and queued output, e.g. 256M.\n"
+             "Producers are throttled when it is reached (default: 4 chunks per worker + 64M queue)",
+    )
+    parser.add_argument(
+        "--io-buffer",
+        type=parse_size,
+        default=DEFAULT_IO_BUFFER,
+        help="(optional) Bytes coalesced per file write, e.g. 4M (default 1M)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("text", "binary"),
+        default="text",
+        help="(optional) Enum output format: text (default) or binary (.sfidb, compact, random access)",
+    )
+    parser.add_argument(
+        "--infile",
+        help="(expand) Binary .sfidb file to stream back as text\n"
+             "(bulk modes, multi-seed) Text file with one ID per line, or - for stdin",
+    )
+    parser.add_argument(
+        "--skip",
+        type=int,
+        default=0,
+        help="(optional) (expand) Index of the first ID to export (O(1) seek)",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="(optional) (expand) Maximum number of IDs to export",
+    )
+    parser.add_argument(
+        "--prefixes",
+        type=load_prefixes,
+        default=(),
+        metavar="FILE",
+        help="(optional) (case-recover) Known prefixes (e.g. key prefixes 001, a0X or full 7-char\n"
+             "prefixes), one per line; 15-char candidates must start with one of them",
+    )
+    parser.add_argument(
+        "--counter-range",
+        type=parse_counter_range,
+        default=(0, MAX_BASE62_8),
+        metavar="LO-HI",
+        help="(optional) (case-recover) Keep only 15-char candidates whose record number is in LO..HI",
+    )
+    parser.add_argument(
+        "--to18",
+        action="store_true",
+        help="(optional) Output 18-char IDs (default outputs 15-char)",
+    )
+    return parser
+
+
+def output_filename(args, ext: str = ".txt") -> str:
+    """--outfile, or the default <scriptname>-<timestamp> name."""
+    return args.outfile or default_output_filename(sys.argv[0] if sys.argv else "sfid-tool.py", ext)
+
+
+def emit_blocks(blocks: Iterable[bytes], args, max_pending: int = DEFAULT_QUEUE_BYTES) -> int:
+    """
+    Drain text blocks to stdout (--displayonly) or to the output file through
+    the single block writer. Returns the process exit code.
+    """
+    if args.displayonly:
+        # PRINT ONLY
+        try:
+            with StdoutWriter(line_buffered=args.line_buffered) as out:
+                for block in blocks:
+                    out.put(block)
+        except BrokenPipeError:
+            # Consumer (head, ffuf, ...) exited early; stop quietly
+            silence_broken_stdout()
+        return 0
+
+    # FILE ONLY
+    outfile = output_filename(args)
+    # Single writer thread consuming whole blocks to avoid race conditions.
+    try:
+        with open_block_writer(outfile, io_buffer=args.io_buffer, max_pending=max_pending) as writer:
+            # Generation runs on the chosen backend; the single writer ensures no file races.
+            for block in blocks:
+                writer.put(block)
+    except (OSError, ValueError) as e:
+        print(f"Error writing to file '{outfile}': {e}", file=sys.stderr)
+        return 4
+    return 0
+
+
+def run_enumeration(args, prefix7: str, start_value: int, mask: IdMask = None) -> int:
+    """
+    enum-from-value / enum-from-current: generate |seq| IDs from start_value.
+    With a `mask`, the "values" are mask ranks 0..size-1 (start_value 0,
+    --seq optionally capping the count) and prefix7 is None: the manifest
+    and checkpoint record the "mask" field instead.
+    """
+    if args.chunk_size < 1:
+        print("Error: --chunk-size must be a positive integer.", file=sys.stderr)
+        return 2
+    if args.split_count is not None and args.split_count < 1:
+        print("Error: --split-count must be a positive integer.", file=sys.stderr)
+        return 2
+
+    seq = args.seq if mask is None else min(args.seq or mask.size, mask.size)
+    step = 1 if seq > 0 else -1
+    total = sequence_length(start_value, seq)
+    # --order random permutes positions of the whole requested range (before sharding)
+    range_start, range_total = start_value, total
+    if args.exclude:
+        # Subtract the exclusion set as intervals; the remainder streams ascending
+        error = check_stream_mode(args)
+        if not error and args.order == "random":
+            error = "--exclude cannot be combined with --order random."
+        if error:
+            print(f"Error: {error}", file=sys.stderr)
+            return 2
+        if total == 0:
+            print("No values generated (sequence may have exceeded bounds).", file=sys.stderr)
+            return 3
+        last = start_value + (total - 1) * step
+        return emit_interval_groups(args, {prefix7: IdRange([(min(start_value, last), max(start_value, last))])})
+    interleaved = args.shard is not None and args.shard_mode == "interleaved"
+    if args.shard is not None:
+        # Deterministic multi-host split of the requested (already clamped) range
+        k, n = args.shard
+        if interleaved:
+            total = interleaved_length(total, args.chunk_size, k, n)
+        else:
+            offset, total = partition_range(total, k, n)
+            start_value += offset * step
+            seq = total * step
+    if total == 0:
+        # No stdout output since you want only IDs there; error goes to stderr
+        print("No values generated (sequence may have exceeded bounds).", file=sys.stderr)
+        return 3
+
+    if args.displayonly and (args.mmap or args.format == "binary"):
+        print("Error: --mmap and --format binary write a file and cannot be combined with --displayonly.",
+              file=sys.stderr)
+        return 2
+    split = args.split_count or (args.split_bytes and max(1, args.split_bytes // line_width(args.to18)))
+    if split and (args.displayonly or args.mmap or args.format == "binary" or interleaved):
+        print("Error: --split-count/--split-bytes write text shard files and cannot be combined with "
+              "--displayonly, --mmap, --format binary or --shard-mode interleaved.", file=sys.stderr)
+        return 2
+    if args.outfile and (args.mmap or args.format == "binary") and compressor_for(args.outfile):
+        print("Error: --mmap and --format binary cannot write compressed (.gz/.bz2/.xz) files.",
+              file=sys.stderr)
+        return 2
+    randomized = args.order == "random"
+    if randomized and split:
+        print("Error: --order random cannot be combined with --split-count/--split-bytes.", file=sys.stderr)
+        return 2
+    checkpointed = args.checkpoint or args.resume
+    if checkpointed and (args.displayonly or split or args.format == "binary"
+                         or (args.outfile and compressor_for(args.outfile))):
+        print("Error: --checkpoint/--resume need plain text file output (no --displayonly, --split-*, "
+              "--format binary or compressed --outfile).", file=sys.stderr)
+        return 2
+    if args.resume and not args.outfile:
+        print("Error: --resume requires the --outfile of the interrupted run.", file=sys.stderr)
+        return 2
+
+    # Work is split into contiguous counter sub-ranges; each task returns one
+    # pre-joined block, so overhead scales with the number of chunks, not IDs.
+    if interleaved:
+        chunks = gen_interleaved_chunks(start_value, seq, args.chunk_size, *args.shard)
+    else:
+        chunks = gen_chunk_ranges(start_value, seq, args.chunk_size)
+
+    if args.format == "binary":
+        # Chunks are stored as runs (merged when contiguous): nothing needs encoding.
+        # A permuted order has no runs, so it is stored packed, one counter per ID.
+        outfile = output_filename(args, ".sfidb")
+        try:
+            if randomized:
+                perm = FeistelPermutation(range_total, args.key)
+                permute = functools.partial(permuted_counters, range_start, step, perm)
+                workers = args.threads if args.threads is not None else default_workers(args.backend)
+                window, _ = plan_memory(args.max_memory, args.chunk_size * 8, workers)
+                with BinaryIdWriter(outfile, prefix7, args.to18, packed=True) as writer:
+                    for counters in iter_blocks(permute, chunks, args.backend, workers, window,
+                                                ordered=True):
+                        writer.add_counters(counters)
+                return 0
+            with BinaryIdWriter(outfile, prefix7, args.to18, descending=step < 0) as writer:
+                for _, first, count in chunks:
+                    writer.add_run(first, count)
+        except OSError as e:
+            print(f"Error writing to file '{outfile}': {e}", file=sys.stderr)
+            return 4
+        return 0
+
+    if args.numpy and np is None:
+        print("Warning: NumPy is not installed; using the pure-Python encoder.", file=sys.stderr)
+    if mask is not None:
+        if randomized:
+            perm = FeistelPermutation(range_total, args.key)
+            encode = functools.partial(encode_mask_permuted_chunk, mask, perm, args.to18)
+        else:
+            encode = functools.partial(encode_mask_chunk, mask, args.to18)
+    elif randomized:
+        perm = FeistelPermutation(range_total, args.key)
+        encode = functools.partial(encode_permuted_chunk, args.numpy, prefix7, range_start, step, perm,
+                                   args.to18)
+    else:
+        encoder = select_encoder(args.numpy)
+        encode = functools.partial(encode_chunk, encoder, prefix7, step, args.to18)
+
+    workers = args.threads if args.threads is not None else default_workers(args.backend)
+    # Pending chunks and queued output are capped (by --max-memory when given),
+    # so large --seq values never pile up in memory
+    block_bytes = args.chunk_size * line_width(args.to18)
+    window, queue_bytes = plan_memory(args.max_memory, block_bytes, workers)
+    if args.max_memory and args.max_memory < 4 * block_bytes:
+        print("Warning: --max-memory is smaller than a few chunks; lower --chunk-size to stay within it.",
+              file=sys.stderr)
+
+    # ENUMERATION OUTPUT BEHAVIOR:
+    # - displayonly: print IDs to stdout (only).
+    # - split: every worker writes whole numbered shard files, plus a manifest.
+    # - mmap: workers write their chunks in place into a preallocated file (ordered).
+    # - else: write IDs to file (only), with thread-safe writer.
+    if split:
+        outfile = output_filename(args)
+        write = functools.partial(write_shard, outfile, encode, step, args.chunk_size)
+        shards = gen_chunk_ranges(start_value, seq, split)
+        try:
+            entries = list(iter_blocks(write, shards, args.backend, workers, window))
+            write_manifest(outfile, {
+                "prefix7": prefix7,
+                "mask": mask.pattern if mask is not None else None,
+                "to18": args.to18,
+                "step": step,
+                "first": start_value,
+                "count": total,
+            }, entries)
+        except (OSError, ValueError) as e:
+            print(f"Error writing shards for '{outfile}': {e}", file=sys.stderr)
+            return 4
+        return 0
+
+    if checkpointed:
+        params = {
+            "prefix7": prefix7,
+            "start": start_value,
+            "seq": seq,
+            "to18": args.to18,
+            "chunk_size": args.chunk_size,
+            "shard": list(args.shard) if args.shard else None,
+            "shard_mode": args.shard_mode,
+            "mmap": args.mmap,
+            "order": args.order,
+            "key": args.key if randomized else None,
+            "mask": mask.pattern if mask is not None else None,
+        }
+        mmap_size = total * line_width(args.to18) if args.mmap else None
+        return emit_checkpointed(args, output_filename(args), chunks, encode, params, mmap_size)
+
+    if args.mmap:
+        outfile = output_filename(args)
+        width = line_width(args.to18)
+        write = functools.partial(write_chunk_mmap, outfile, args.chunk_size, width, encode)
+        try:
+            preallocate_output(outfile, total * width)
+            for _ in iter_blocks(write, chunks, args.backend, workers, window):
+                pass
+        except OSError as e:
+            print(f"Error writing to file '{outfile}': {e}", file=sys.stderr)
+            return 4
+        finally:
+            close_shared_mmaps()
+        return 0
+
+    # Blocks arrive in chunk order when sequential or --ordered; otherwise order not guaranteed
+    blocks = iter_blocks(encode, chunks, args.backend, workers, window, args.ordered)
+    return emit_blocks(blocks, args, queue_bytes)
+
+
+def emit_checkpointed(args, outfile: str, chunks: Iterable[Tuple[int, int, int]],
+                      encode: Callable[[Tuple[int, int, int]], bytes], params: dict,
+                      mmap_size: int = None) -> int:
+    """
+    File output with periodic checkpoints (--checkpoint/--resume). Chunks the
+    checkpoint marks as done are skipped; streaming output continues at the
+    recorded byte offset, --mmap output rewrites only the missing chunks.
+    SIGINT flushes the writer and saves a final checkpoint.
+    """
+    try:
+        ckpt = open_checkpoint(outfile, params, args.resume)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    todo = (chunk for chunk in chunks if not ckpt.is_done(chunk[0]))
+    workers = args.threads if args.threads is not None else default_workers(args.backend)
+    window, queue_bytes = plan_memory(args.max_memory, args.chunk_size * line_width(args.to18), workers)
+    # Ctrl+C only sets a flag; the loops stop at the next finished chunk, so the
+    # executor and writer are never interrupted half-way through an operation.
+    stop = threading.Event()
+    previous_handler = signal.signal(signal.SIGINT, lambda signum, frame: stop.set())
+    last_save = time.monotonic()
+    try:
+        if mmap_size is not None:
+            if not args.resume:
+                preallocate_output(outfile, mmap_size)
+            ckpt.offset = mmap_size
+            write = functools.partial(write_chunk_mmap, outfile, args.chunk_size,
+                                      line_width(args.to18), encode)
+            try:
+                for index in iter_blocks(write, todo, args.backend, workers, window):
+                    ckpt.mark(index)
+                    if stop.is_set():
+                        break
+                    if time.monotonic() - last_save >= CHECKPOINT_INTERVAL:
+                        ckpt.save()
+                        last_save = time.monotonic()
+            finally:
+                close_shared_mmaps()
+        else:
+            with BlockWriter(outfile, io_buffer=args.io_buffer, max_pending=queue_bytes,
+                             truncate_at=ckpt.offset) as writer:
+                queued = []
+
+                def commit():
+                    # Only chunks the writer has fully handed to the OS are marked done
+                    writer.flush()
+                    for index in queued:
+                        ckpt.mark(index)
+                    queued.clear()
+                    ckpt.offset = writer.position
+
+                tagged = functools.partial(tag_chunk, encode)
+                try:
+                    for index, block in iter_blocks(tagged, todo, args.backend, workers, window,
+                                                    args.ordered):
+                        writer.put(block)
+                        queued.append(index)
+                        if stop.is_set():
+                            break
+                        if time.monotonic() - last_save >= CHECKPOINT_INTERVAL:
+                            commit()
+                            ckpt.save()
+                            last_save = time.monotonic()
+                finally:
+                    commit()
+    except OSError as e:
+        print(f"Error writing to file '{outfile}': {e}", file=sys.stderr)
+        # The checkpoint usually lives next to the output, so it may fail the same way
+        try:
+            ckpt.save()
+        except OSError as save_error:
+            print(f"Error: could not save checkpoint '{ckpt.path}': {save_error}", file=sys.stderr)
+        return 4
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    if stop.is_set():
+        ckpt.save()
+        print(f"Interrupted; progress saved to '{ckpt.path}'. Re-run with --resume to continue.",
+              file=sys.stderr)
+        return 130
+    ckpt.remove()
+    return 0
+
+
+def run_expand(args) -> int:
+    """expand: stream a binary .sfidb file (or a sub-range of it) back as text IDs."""
+    if not args.infile:
+        print("Error: --infile must be provided for --mode expand.", file=sys.stderr)
+        return 2
+    if args.skip < 0 or (args.limit is not None and args.limit < 0):
+        print("Error: --skip and --limit must be non-negative.", file=sys.stderr)
+        return 2
+    if args.chunk_size < 1:
+        print("Error: --chunk-size must be a positive integer.", file=sys.stderr)
+        return 2
+    try:
+        reader = BinaryIdReader(args.infile)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    with reader:
+        if args.to18:
+            reader.to18 = True
+        stop = None if args.limit is None else args.skip + args.limit
+        return emit_blocks(reader.iter_text_blocks(args.skip, stop, args.chunk_size), args)
+
+
+def run_bulk(args, worker: Callable[[Tuple[int, int, bytes]], bytes], report=None) -> int:
+    """
+    Bulk modes: stream --infile (or stdin) through `worker` in parallel line
+    chunks on the selected backend; output records keep the input order.
+    With a `report` (BulkReport), worker results are passed through
+    report.collect() and a summary is printed to stderr at the end.
+    """
+    if not args.infile:
+        print(f"Error: --infile (a file, or - for stdin) must be provided for --mode {args.mode}.",
+              file=sys.stderr)
+        return 2
+    if args.chunk_size < 1:
+        print("Error: --chunk-size must be a positive integer.", file=sys.stderr)
+        return 2
+    # --chunk-size counts IDs; ~20 bytes per input line (18 chars + CRLF)
+    chunk_bytes = args.chunk_size * 20
+    workers = args.threads if args.threads is not None else default_workers(args.backend)
+    window, queue_bytes = plan_memory(args.max_memory, 4 * chunk_bytes, workers)
+    read_errors = []
+
+    def read_chunks(chunks):
+        # A failing read ends the input here, instead of reaching emit_blocks as a write error
+        try:
+            yield from chunks
+        except (OSError, EOFError) as e:
+            read_errors.append(e)
+
+    try:
+        chunks = iter_input_chunks(args.infile, chunk_bytes)
+        # Open the input before any output file is created
+        head = next(chunks, None)
+    except (OSError, EOFError) as e:
+        print(f"Error reading '{args.infile}': {e}", file=sys.stderr)
+        return 2
+    chunks = read_chunks(itertools.chain(() if head is None else (head,), chunks))
+    blocks = iter_blocks(worker, chunks, args.backend, workers, window, ordered=True)
+    if report is not None:
+        blocks = report.collect(blocks)
+    rc = emit_blocks(blocks, args, queue_bytes)
+    if read_errors:
+        print(f"Error reading '{args.infile}': {read_errors[0]}", file=sys.stderr)
+        return 2
+    if report is not None and rc == 0:
+        report.summary()
+    return rc
+
+
+def check_stream_mode(args) -> str:
+    """
+    Shared argument checks of the single-stream modes (multi-seed, spiral,
+    --range, --exclude); returns an error message or ''.
+    """
+    if args.mode in ("multi-seed", "spiral") and args.window is None:
+        return f"--window must be provided for --mode {args.mode}."
+    if args.chunk_size < 1:
+        return "--chunk-size must be a positive integer."
+    if (args.mmap or args.split_count or args.split_bytes or args.checkpoint or args.resume
+            or args.format == "binary" or args.shard is not None):
+        name = "--range" if args.range else "--exclude" if args.exclude else args.mode
+        return (f"{name} writes a single text stream; --mmap, --split-*, --checkpoint, --resume, "
+                "--format binary and --shard are not supported.")
+    return ""
+
+
+def run_mask(args) -> int:
+    """mask: every ID matching --mask, in ascending order; the count is reported first."""
+    if not args.mask:
+        print("Error: --mask must be provided for --mode mask.", file=sys.stderr)
+        return 2
+    try:
+        mask = IdMask(args.mask)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(f"Mask {mask.pattern} matches {mask.size} IDs.", file=sys.stderr)
+    if mask.size > MAX_BASE62_8 + 1:
+        print(f"Error: masks are limited to 62^8 ({MAX_BASE62_8 + 1}) IDs; fix more positions.",
+              file=sys.stderr)
+        return 2
+    if args.seq is not None and args.seq <= 0:
+        print("Error: --seq caps the number of mask IDs and must be positive.", file=sys.stderr)
+        return 2
+    if args.format == "binary" or args.exclude or args.range:
+        print("Error: --mode mask cannot be combined with --format binary, --exclude or --range.",
+              file=sys.stderr)
+        return 2
+    return run_enumeration(args, None, 0, mask)
+
+
+def run_spiral(args, prefix7: str, seed: int) -> int:
+    """
+    spiral: stream seed, seed+1, seed-1, seed+2, seed-2, ... lazily and in
+    order (nearest first), within the --window budget and the counter bounds.
+    """
+    error = check_stream_mode(args)
+    if error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+    if args.numpy and np is None:
+        print("Warning: NumPy is not installed; using the pure-Python encoder.", file=sys.stderr)
+    sides, chunks = gen_spiral_chunks(seed, args.window, args.chunk_size)
+    encode = functools.partial(encode_spiral_chunk, select_encoder(args.numpy), prefix7, seed, sides,
+                               args.to18)
+    workers = args.threads if args.threads is not None else default_workers(args.backend)
+    # A chunk of distances holds up to two IDs per distance (one per side)
+    window, queue_bytes = plan_memory(args.max_memory, 2 * args.chunk_size * line_width(args.to18), workers)
+    blocks = iter_blocks(encode, chunks, args.backend, workers, window, ordered=True)
+    return emit_blocks(blocks, args, queue_bytes)
+
+
+def run_multi_seed(args) -> int:
+    """
+    multi-seed: enumerate +/- --window around every seed in --infile, each ID
+    exactly once. Windows are merged per prefix7 into disjoint intervals, which
+    are chunked and encoded in parallel.
+    """
+    if not args.infile:
+        print("Error: --infile (a seed file, or - for stdin) must be provided for --mode multi-seed.",
+              file=sys.stderr)
+        return 2
+    error = check_stream_mode(args)
+    if error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+    try:
+        if args.infile == "-":
+            seeds = [line.strip() for line in sys.stdin if line.strip()]
+        else:
+            with open(args.infile, "r", encoding="ascii", errors="replace") as f:
+                seeds = [line.strip() for line in f if line.strip()]
+    except OSError as e:
+        print(f"Error reading '{args.infile}': {e}", file=sys.stderr)
+        return 2
+
+    groups, rejected = seed_windows(seeds, args.window)
+    for seed in rejected:
+        print(f"Warning: skipping invalid seed {seed!r}", file=sys.stderr)
+    if not groups:
+        print("No values generated (no valid seeds).", file=sys.stderr)
+        return 3
+
+    return emit_interval_groups(args, groups)
+
+
+def run_ranges(args) -> int:
+    """enum modes with --range: enumerate the merged intervals of a range expression."""
+    if args.start is not None or args.seq is not None:
+        print("Error: --range replaces --start/--seq; do not combine them.", file=sys.stderr)
+        return 2
+    error = check_stream_mode(args)
+    if error:
+        print(f"Error: {error}", file=sys.stderr)
+        return 2
+    try:
+        groups = parse_range_expr(args.range, args.id)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    if not any(groups.values()):
+        print("No values generated (empty range).", file=sys.stderr)
+        return 3
+    return emit_interval_groups(args, groups)
+
+
+def emit_interval_groups(args, groups: dict) -> int:
+    """
+    Encode {prefix7: IdRange} in parallel chunks and emit them (sorted with
+    --ordered). IDs found in the --exclude files are subtracted first.
+    """
+    excluded = None
+    if args.exclude:
+        try:
+            excluded = load_exclusions(args.exclude, groups)
+        except (OSError, ValueError, EOFError) as e:
+            print(f"Error reading --exclude files: {e}", file=sys.stderr)
+            return 2
+    chunks = gen_interval_chunks(groups, args.chunk_size, excluded)
+    first = next(chunks, None)
+    if first is None:
+        print("No values generated (every requested ID is excluded).", file=sys.stderr)
+        return 3
+    chunks = itertools.chain((first,), chunks)
+    if args.numpy and np is None:
+        print("Warning: NumPy is not installed; using the pure-Python encoder.", file=sys.stderr)
+    encode = functools.partial(encode_interval_chunk, select_encoder(args.numpy), args.to18)
+    workers = args.threads if args.threads is not None else default_workers(args.backend)
+    window, queue_bytes = plan_memory(args.max_memory, args.chunk_size * line_width(args.to18), workers)
+    blocks = iter_blocks(encode, chunks, args.backend, workers, window, ordered=args.ordered)
+    return emit_blocks(blocks, args, queue_bytes)
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.mode == "expand":
+        return run_expand(args)
+    if args.mode == "bulk-decode":
+        return run_bulk(args, analyze_chunk)
+    if args.mode == "bulk-repair":
+        return run_bulk(args, repair_chunk, BulkReport(REPAIR_KINDS))
+    if args.mode == "case-recover":
+        worker = functools.partial(case_recover_chunk, to18=args.to18,
+                                   prefixes=args.prefixes, counter_range=args.counter_range)
+        return run_bulk(args, worker, BulkReport(CASE_KINDS))
+    if args.mode == "multi-seed":
+        return run_multi_seed(args)
+    if args.mode == "mask":
+        return run_mask(args)
+    if args.range and args.mode in ("enum-from-value", "enum-from-current"):
+        # The range expression carries its own anchors; -i is only the default
+        return run_ranges(args)
+
+    if not args.id:
+        print(f"Error: -i/--id is required for --mode {args.mode}.", file=sys.stderr)
+        return 2
+
+    # Normalize ID to 15 chars & split components
+    try:
+        id15 = normalize_to_15(args.id)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    try:
+        prefix7, counter8 = split_id_components(id15)
+        current_value = base62_to_int(counter8)
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    # Mode: decode -> print integer only and exit
+    if args.mode == "decode":
+        print(current_value)
+        return 0
+
+    if args.mode == "spiral":
+        return run_spiral(args, prefix7, current_value)
+
+    # Enum modes require --seq (non-zero)
+    if args.seq is None or args.seq == 0:
+        print("Error: --seq must be provided and non-zero for enumeration modes.", file=sys.stderr)
+        return 2
+
+    if args.mode == "enum-from-value":
+        if args.start is None:
+            print("Error: --start must be provided for --mode enum-from-value.", file=sys.stderr)
+            return 2
+        if args.start < 0 or args.start > MAX_BASE62_8:
+            print(f"Error: --start must be between 0 and {MAX_BASE62_8}.", file=sys.stderr)
+            return 2
+        start_value = args.start
+    else:
+        # enum-from-current
+        start_value = current_value
+
+    return run_enumeration(args, prefix7, start_value)
 
 
 if __name__ == "__main__":